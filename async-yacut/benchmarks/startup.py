@@ -0,0 +1,83 @@
+"""Замер холодного старта воркера yacut.
+
+Каждый прогон выполняется в отдельном интерпретаторе: измеряется время
+`import yacut`, первого запроса к API и первого запроса к странице
+с формой. Запуск из каталога async-yacut:
+
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROBE = '''
+import json
+import sys
+import time
+
+started = time.perf_counter()
+import yacut
+imported = time.perf_counter()
+modules = len(sys.modules)
+
+app = yacut.app
+app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+with app.app_context():
+    yacut.db.create_all()
+client = app.test_client()
+api_started = time.perf_counter()
+client.get('/api/id/missing/')
+api_finished = time.perf_counter()
+client.get('/')
+page_finished = time.perf_counter()
+
+print(json.dumps({
+    'import': imported - started,
+    'first_api_request': api_finished - api_started,
+    'first_page_request': page_finished - api_finished,
+    'modules_after_import': modules,
+}))
+'''
+
+
+def run_probe():
+    env = dict(
+        os.environ,
+        DATABASE_URI='sqlite:///:memory:',
+        SECRET_KEY='benchmark',
+        PYTHONPATH=str(BASE_DIR),
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=BASE_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(args.runs)]
+    for key in results[0]:
+        values = [result[key] for result in results]
+        median = statistics.median(values)
+        if key.startswith('modules'):
+            print(f'{key:>22}: {median:.0f}')
+        else:
+            print(f'{key:>22}: {median * 1000:8.1f} ms (median)')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 class Config(object):
@@ -11,3 +12,25 @@ class Config(object):
     FLASK_DEBUG = os.getenv('FLASK_DEBUG')
     TEMPLATE_FOLDER = os.getenv('TEMPLATE_FOLDER', '../html/templates')
     STATIC_FOLDER = os.getenv('STATIC_FOLDER', '../html')
+    UPLOADS_TMP_DIR = os.getenv(
+        'UPLOADS_TMP_DIR',
+        os.path.join(tempfile.gettempdir(), 'yacut_uploads'),
+    )
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024))
+    UPLOAD_TTL = int(os.getenv('UPLOAD_TTL', 24 * 60 * 60))
+    UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 1024 * 1024 * 1024))
+    REMOTE_UPLOAD_TIMEOUT = int(os.getenv('REMOTE_UPLOAD_TIMEOUT', 300))
+    REMOTE_UPLOAD_ALLOW_PRIVATE = os.getenv(
+        'REMOTE_UPLOAD_ALLOW_PRIVATE', 'False'
+    ).lower() in ('1', 'true', 'yes')
+    PERMANENT_REDIRECTS = os.getenv(
+        'PERMANENT_REDIRECTS', 'False'
+    ).lower() in ('1', 'true', 'yes')
+    REDIRECT_CACHE_MAX_AGE = int(os.getenv('REDIRECT_CACHE_MAX_AGE', 0))
+    API_CACHE_MAX_AGE = int(os.getenv('API_CACHE_MAX_AGE', 0))
+    SQL_PROFILER_ENABLED = os.getenv(
+        'SQL_PROFILER_ENABLED', 'False'
+    ).lower() in ('1', 'true', 'yes')
+    SQL_SLOW_REQUEST_MS = int(os.getenv('SQL_SLOW_REQUEST_MS', 500))
+    SQL_PROFILER_TOP = int(os.getenv('SQL_PROFILER_TOP', 3))
+    SQL_PROFILER_TOKEN = os.getenv('SQL_PROFILER_TOKEN', '')
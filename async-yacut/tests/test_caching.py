@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+GET_ORIGINAL_LINK_URL = '/api/id/{short_id}/'
+
+
+@pytest.fixture
+def caching_app(_app):
+    _app.config.update({
+        'PERMANENT_REDIRECTS': True,
+        'REDIRECT_CACHE_MAX_AGE': 3600,
+        'API_CACHE_MAX_AGE': 60,
+    })
+    yield _app
+    _app.config.update({
+        'PERMANENT_REDIRECTS': False,
+        'REDIRECT_CACHE_MAX_AGE': 0,
+        'API_CACHE_MAX_AGE': 0,
+    })
+
+
+def test_permanent_redirect(caching_app, client, short_python_url):
+    response = client.get(f'/{short_python_url.short}')
+    assert response.status_code == HTTPStatus.MOVED_PERMANENTLY, (
+        'При включенном `PERMANENT_REDIRECTS` переход по короткой ссылке '
+        f'должен возвращать статус-код {HTTPStatus.MOVED_PERMANENTLY.value}.'
+    )
+    assert response.cache_control.max_age == 3600, (
+        'Редирект должен содержать `Cache-Control: max-age` из '
+        '`REDIRECT_CACHE_MAX_AGE`.'
+    )
+
+
+def test_api_lookup_validators(caching_app, client, short_python_url):
+    url = GET_ORIGINAL_LINK_URL.format(short_id=short_python_url.short)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers.get('ETag'), (
+        f'Ответ эндпоинта `{GET_ORIGINAL_LINK_URL}` должен содержать ETag.'
+    )
+    assert response.headers.get('Last-Modified'), (
+        f'Ответ эндпоинта `{GET_ORIGINAL_LINK_URL}` должен содержать '
+        'Last-Modified.'
+    )
+    assert response.cache_control.max_age == 60
+
+    response = client.get(
+        url, headers={'If-None-Match': response.headers['ETag']}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Условный GET-запрос с актуальным ETag должен возвращать статус-код '
+        f'{HTTPStatus.NOT_MODIFIED.value}.'
+    )
+    assert not response.data
@@ -0,0 +1,147 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from tests.yandex_disk_mock_server import (
+    COMMON_ASSERT_MSG_FOR_UPLOAD_FILES, intercept_requests
+)
+from yacut.models import URLMap
+
+UPLOADS_URL = '/api/files/uploads/'
+UPLOAD_URL = UPLOADS_URL + '{upload_id}/'
+CHUNK_URL = UPLOADS_URL + '{upload_id}/{index}/'
+COMPLETE_URL = UPLOADS_URL + '{upload_id}/complete/'
+CHUNK_SIZE = 4
+FILE_CONTENT = b'0123456789'
+EXPECTED_API_CALLS = {
+    'get_upload_link',
+    'upload',
+    'get_download_link'
+}
+
+
+@pytest.fixture
+def chunked_app(_app, tmp_path):
+    _app.config.update({
+        'UPLOADS_TMP_DIR': str(tmp_path),
+        'UPLOAD_CHUNK_SIZE': CHUNK_SIZE,
+    })
+    return _app
+
+
+def init_upload(client, filename='notes.txt'):
+    response = client.post(UPLOADS_URL, json={
+        'filename': filename,
+        'size': len(FILE_CONTENT),
+    })
+    assert response.status_code == HTTPStatus.CREATED, (
+        f'POST-запрос к эндпоинту `{UPLOADS_URL}` должен вернуть ответ со '
+        f'статус-кодом {HTTPStatus.CREATED.value}.'
+    )
+    return response.json
+
+
+def test_init_upload(chunked_app, client):
+    upload = init_upload(client)
+    assert upload['chunks'] == 3, (
+        'Количество фрагментов должно вычисляться из размера файла и '
+        '`UPLOAD_CHUNK_SIZE`.'
+    )
+    assert upload['received'] == [], (
+        'У новой загрузки не должно быть принятых фрагментов.'
+    )
+
+
+def test_resume_upload(chunked_app, client):
+    upload_id = init_upload(client)['upload_id']
+    response = client.put(
+        CHUNK_URL.format(upload_id=upload_id, index=1),
+        data=FILE_CONTENT[CHUNK_SIZE:2 * CHUNK_SIZE],
+    )
+    assert response.status_code == HTTPStatus.OK
+    response = client.get(UPLOAD_URL.format(upload_id=upload_id))
+    assert response.json['received'] == [1], (
+        f'GET-запрос к эндпоинту `{UPLOAD_URL}` должен возвращать список '
+        'принятых фрагментов, чтобы загрузку можно было возобновить.'
+    )
+
+
+def test_chunk_with_wrong_size(chunked_app, client):
+    upload_id = init_upload(client)['upload_id']
+    response = client.put(
+        CHUNK_URL.format(upload_id=upload_id, index=0),
+        data=FILE_CONTENT,
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST, (
+        'Фрагмент неверного размера должен отклоняться со статус-кодом '
+        f'{HTTPStatus.BAD_REQUEST.value}.'
+    )
+
+
+def test_complete_incomplete_upload(chunked_app, client):
+    upload_id = init_upload(client)['upload_id']
+    response = client.post(COMPLETE_URL.format(upload_id=upload_id))
+    assert response.status_code == HTTPStatus.BAD_REQUEST, (
+        'Завершение загрузки без всех фрагментов должно возвращать '
+        f'статус-код {HTTPStatus.BAD_REQUEST.value}.'
+    )
+
+
+def test_init_upload_too_large(chunked_app, client, monkeypatch):
+    monkeypatch.setitem(
+        chunked_app.config, 'UPLOAD_MAX_SIZE', len(FILE_CONTENT) - 1
+    )
+    response = client.post(UPLOADS_URL, json={
+        'filename': 'notes.txt',
+        'size': len(FILE_CONTENT),
+    })
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE, (
+        f'POST-запрос к эндпоинту `{UPLOADS_URL}` с размером больше '
+        '`UPLOAD_MAX_SIZE` должен вернуть ответ со статус-кодом '
+        f'{HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value}.'
+    )
+
+
+def test_unknown_upload(chunked_app, client):
+    response = client.get(UPLOAD_URL.format(upload_id='0' * 32))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+async def test_complete_upload(chunked_app, client, mock_server,
+                               monkeypatch):
+    mock_server, user_calls = await mock_server
+    await intercept_requests(mock_server, monkeypatch)
+
+    def sync_test():
+        upload_id = init_upload(client)['upload_id']
+        for index in (2, 0, 1):
+            start = index * CHUNK_SIZE
+            client.put(
+                CHUNK_URL.format(upload_id=upload_id, index=index),
+                data=FILE_CONTENT[start:start + CHUNK_SIZE],
+            )
+        response = client.post(
+            COMPLETE_URL.format(upload_id=upload_id),
+            json={'custom_id': 'notes'},
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'POST-запрос к эндпоинту `{COMPLETE_URL}` после загрузки всех '
+            'фрагментов должен вернуть ответ со статус-кодом '
+            f'{HTTPStatus.CREATED.value}.'
+        )
+        assert not (EXPECTED_API_CALLS - user_calls), (
+            COMMON_ASSERT_MSG_FOR_UPLOAD_FILES
+        )
+        response = client.get(UPLOAD_URL.format(upload_id=upload_id))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'После завершения загрузки временные фрагменты должны удаляться.'
+        )
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, sync_test)
+    url_map = URLMap.query.filter_by(short='notes').first()
+    assert url_map and url_map.is_file and url_map.original == 'notes.txt'
+    assert mock_server.app['uploads']['notes.txt'] == FILE_CONTENT, (
+        'Фрагменты должны отправляться на Я.Диск по порядку одним файлом.'
+    )
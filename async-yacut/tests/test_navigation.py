@@ -0,0 +1,27 @@
+import re
+
+import pytest
+
+NAV_LINK_PATTERN = re.compile(
+    r'<a class="nav-link ([^"]*)"\s+aria-current="([^"]*)"\s+href="([^"]+)"'
+)
+
+
+@pytest.mark.parametrize('url, other_url', [
+    ('/', '/files'),
+    ('/files', '/'),
+])
+def test_header_marks_current_page(client, url, other_url):
+    links = {
+        href: (classes.strip(), current)
+        for classes, current, href in NAV_LINK_PATTERN.findall(
+            client.get(url).data.decode()
+        )
+    }
+    assert links[url] == ('active', 'page'), (
+        'Убедитесь, что ссылка на текущую страницу в меню отмечена '
+        'классом `active` и атрибутом `aria-current="page"`.'
+    )
+    assert links[other_url] == ('', ''), (
+        'Убедитесь, что остальные ссылки меню не отмечены как активные.'
+    )
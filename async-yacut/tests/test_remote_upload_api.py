@@ -0,0 +1,160 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from tests.conftest import TEST_BASE_URL
+from tests.yandex_disk_mock_server import (
+    COMMON_ASSERT_MSG_FOR_UPLOAD_FILES, REDIRECT_REMOTE_FILE_URL,
+    REMOTE_FILE_URL, SLOW_REMOTE_FILE_URL, intercept_requests
+)
+from yacut.models import URLMap
+
+REMOTE_UPLOAD_URL = '/api/files/'
+EXPECTED_API_CALLS = {
+    'get_upload_link',
+    'remote_file',
+    'upload',
+    'get_download_link'
+}
+
+
+async def test_upload_from_remote_url(client, mock_server, monkeypatch):
+    mock_server, user_calls = await mock_server
+    await intercept_requests(mock_server, monkeypatch)
+    # Мок-сервер слушает 127.0.0.1, который по умолчанию запрещен.
+    monkeypatch.setitem(
+        client.application.config, 'REMOTE_UPLOAD_ALLOW_PRIVATE', True
+    )
+    source_url = (
+        f'http://{mock_server.host}:{mock_server.port}'
+        f'{REMOTE_FILE_URL}/report.pdf'
+    )
+
+    def sync_test():
+        response = client.post(REMOTE_UPLOAD_URL, json={
+            'url': source_url,
+            'custom_id': 'report',
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'POST-запрос к эндпоинту `{REMOTE_UPLOAD_URL}` с корректной '
+            'внешней ссылкой должен вернуть ответ со статус-кодом '
+            f'{HTTPStatus.CREATED.value}.'
+        )
+        assert response.json == {
+            'url': 'report.pdf',
+            'short_link': f'{TEST_BASE_URL}/report',
+        }, (
+            f'Ответ на POST-запрос к эндпоинту `{REMOTE_UPLOAD_URL}` '
+            'должен содержать имя файла и короткую ссылку на него.'
+        )
+        assert not (EXPECTED_API_CALLS - user_calls), (
+            COMMON_ASSERT_MSG_FOR_UPLOAD_FILES
+        )
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, sync_test)
+    url_map = URLMap.query.filter_by(short='report').first()
+    assert url_map and url_map.is_file, (
+        'Файл, загруженный по внешней ссылке, должен сохраняться в базе '
+        'данных как запись с `is_file=True`.'
+    )
+
+
+@pytest.mark.parametrize('source_url', [
+    'file:///etc/passwd.txt',
+    'http:///report.pdf',
+    123,
+    ['https://example.com/report.pdf'],
+])
+def test_remote_url_invalid_scheme(client, source_url):
+    response = client.post(REMOTE_UPLOAD_URL, json={'url': source_url})
+    assert response.status_code == HTTPStatus.BAD_REQUEST, (
+        f'POST-запрос к эндпоинту `{REMOTE_UPLOAD_URL}` со ссылкой не по '
+        'протоколу http(s) или без хоста должен вернуть ответ со '
+        f'статус-кодом {HTTPStatus.BAD_REQUEST.value}.'
+    )
+
+
+def test_remote_url_invalid_extension(client):
+    response = client.post(REMOTE_UPLOAD_URL, json={
+        'url': 'https://example.com/script.exe',
+    })
+    assert response.status_code == HTTPStatus.BAD_REQUEST, (
+        f'POST-запрос к эндпоинту `{REMOTE_UPLOAD_URL}` со ссылкой на файл '
+        'с недопустимым расширением должен вернуть ответ со статус-кодом '
+        f'{HTTPStatus.BAD_REQUEST.value}.'
+    )
+
+
+@pytest.mark.parametrize('source_url', [
+    'http://127.0.0.1/file.pdf',
+    'http://169.254.169.254/latest/meta-data.txt',
+    'http://[::1]/file.pdf',
+    'http://[::ffff:10.0.0.1]/file.pdf',
+    'http://localhost/file.pdf',
+])
+def test_remote_url_private_address(client, source_url):
+    response = client.post(REMOTE_UPLOAD_URL, json={'url': source_url})
+    assert response.status_code == HTTPStatus.BAD_REQUEST, (
+        f'POST-запрос к эндпоинту `{REMOTE_UPLOAD_URL}` со ссылкой на '
+        'локальный или служебный адрес должен вернуть ответ со статус-кодом '
+        f'{HTTPStatus.BAD_REQUEST.value}.'
+    )
+    assert URLMap.query.count() == 0
+
+
+async def test_remote_url_redirect_not_followed(
+    client, mock_server, monkeypatch
+):
+    mock_server, user_calls = await mock_server
+    await intercept_requests(mock_server, monkeypatch)
+    monkeypatch.setitem(
+        client.application.config, 'REMOTE_UPLOAD_ALLOW_PRIVATE', True
+    )
+    source_url = (
+        f'http://{mock_server.host}:{mock_server.port}'
+        f'{REDIRECT_REMOTE_FILE_URL}/report.pdf'
+    )
+
+    def sync_test():
+        return client.post(REMOTE_UPLOAD_URL, json={'url': source_url})
+
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(None, sync_test)
+    assert response.status_code == HTTPStatus.BAD_GATEWAY, (
+        'Перенаправления при загрузке файла по внешней ссылке не должны '
+        'выполняться.'
+    )
+    assert response.json == {
+        'message': 'Не удалось загрузить файл по ссылке'
+    }, 'Текст ошибки клиента aiohttp не должен попадать в ответ.'
+    assert 'redirect_remote_file' in user_calls
+    assert 'upload' not in user_calls
+
+
+async def test_remote_url_timeout(client, mock_server, monkeypatch):
+    mock_server, user_calls = await mock_server
+    await intercept_requests(mock_server, monkeypatch)
+    monkeypatch.setitem(
+        client.application.config, 'REMOTE_UPLOAD_ALLOW_PRIVATE', True
+    )
+    monkeypatch.setitem(
+        client.application.config, 'REMOTE_UPLOAD_TIMEOUT', 0.5
+    )
+    source_url = (
+        f'http://{mock_server.host}:{mock_server.port}'
+        f'{SLOW_REMOTE_FILE_URL}/report.pdf'
+    )
+
+    def sync_test():
+        return client.post(REMOTE_UPLOAD_URL, json={'url': source_url})
+
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(None, sync_test)
+    assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT, (
+        f'POST-запрос к эндпоинту `{REMOTE_UPLOAD_URL}`, если внешний '
+        'сервер не ответил вовремя, должен вернуть ответ со статус-кодом '
+        f'{HTTPStatus.GATEWAY_TIMEOUT.value}.'
+    )
+    assert URLMap.query.count() == 0
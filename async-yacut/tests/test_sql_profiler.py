@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from settings import Config
+from yacut import create_app, db
+
+STATS_URL = '/api/debug/sql/'
+TOKEN = 'profiler-token'
+
+
+class ProfilerConfig(Config):
+    TESTING = True
+    SQL_PROFILER_ENABLED = True
+    SQL_SLOW_REQUEST_MS = 0
+    SQL_PROFILER_TOKEN = TOKEN
+
+
+@pytest.fixture
+def profiled_app():
+    app = create_app(ProfilerConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+        db.session.close()
+
+
+@pytest.fixture
+def profiled_client(profiled_app):
+    return profiled_app.test_client()
+
+
+def test_profiler_disabled_by_default(client):
+    response = client.get('/api/id/missing/')
+    assert 'X-SQL-Queries' not in response.headers, (
+        'Без `SQL_PROFILER_ENABLED` профилировщик не должен подключаться.'
+    )
+    assert client.get(STATS_URL).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_profiler_counts_queries(profiled_client):
+    response = profiled_client.get('/api/id/missing/')
+    assert response.headers.get('X-SQL-Queries') == '1', (
+        'Профилировщик должен подсчитывать SQL-запросы каждого запроса.'
+    )
+    stats = profiled_client.get(
+        STATS_URL, headers={'X-SQL-Profiler-Token': TOKEN}
+    ).json
+    assert stats['api.get_original_link']['requests'] == 1
+    assert stats['api.get_original_link']['queries'] == 1
+
+
+@pytest.mark.parametrize('headers', [
+    {},
+    {'X-SQL-Profiler-Token': 'wrong'},
+])
+def test_stats_require_token(profiled_client, headers):
+    assert profiled_client.get(
+        STATS_URL, headers=headers
+    ).status_code == HTTPStatus.NOT_FOUND, (
+        'Статистика профилировщика не должна отдаваться без токена.'
+    )
+
+
+def test_stats_open_in_debug(profiled_app, monkeypatch):
+    monkeypatch.setitem(profiled_app.config, 'SQL_PROFILER_TOKEN', '')
+    client = profiled_app.test_client()
+    assert client.get(STATS_URL).status_code == HTTPStatus.NOT_FOUND
+    profiled_app.debug = True
+    assert client.get(STATS_URL).status_code == HTTPStatus.OK
+
+
+def test_failed_statement_does_not_leak_start_time(profiled_app):
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM missing_table'))
+        assert not connection.info.get('query_start_time'), (
+            'Время начала упавшего SQL-запроса не должно оставаться в '
+            'соединении.'
+        )
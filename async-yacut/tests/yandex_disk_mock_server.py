@@ -1,3 +1,4 @@
+import asyncio
 import aiohttp
 import re
 from contextlib import suppress
@@ -10,6 +11,10 @@ from aiohttp import web
 REQUEST_UPLOAD_URL = '/v1/disk/resources/upload'
 UPLOAD_URL = '/upload-target'
 DOWNLOAD_LINK_URL = '/v1/disk/resources/download'
+REMOTE_FILE_URL = '/remote-files'
+SLOW_REMOTE_FILE_URL = '/slow-remote-files'
+REDIRECT_REMOTE_FILE_URL = '/redirect-remote-files'
+REMOTE_FILE_CONTENT = b'remote file content' * 1024
 
 COMMON_ASSERT_MSG_FOR_UPLOAD_FILES = (
     'Убедитесь, что для загрузки полученных файлов на Яндекс Диск `'
@@ -84,6 +89,7 @@ async def mock_server(aiohttp_server):
             'Убедитесь, что PUT-запрос на загрузку файла на Яндекс Диск '
             'содержит загружаемые данные.'
         )
+        request.app['uploads'][file_names[request.url.name]] = request_data
         location_header = '/disk/{}'.format(
             quote(file_names[request.url.name])
         )
@@ -129,16 +135,43 @@ async def mock_server(aiohttp_server):
             status=200
         )
 
+    async def remote_file_handler(request):
+        """Обработчик для запросов к внешнему файлу."""
+        user_calls.add('remote_file')
+        return web.Response(
+            body=REMOTE_FILE_CONTENT,
+            content_type='application/octet-stream',
+        )
+
+    async def slow_remote_file_handler(request):
+        """Обработчик, который отвечает дольше допустимого."""
+        user_calls.add('slow_remote_file')
+        await asyncio.sleep(5)
+        return web.Response(body=REMOTE_FILE_CONTENT)
+
+    async def redirect_remote_file_handler(request):
+        """Обработчик, который перенаправляет на внутренний адрес."""
+        user_calls.add('redirect_remote_file')
+        raise web.HTTPFound('http://169.254.169.254/latest/meta-data.txt')
+
     async def catch_all_handler(request):
         """Обработчик для любых других запросов."""
         raise AssertionError(COMMON_ASSERT_MSG_FOR_UPLOAD_FILES)
 
     app = web.Application()
+    app['uploads'] = {}
     app.router.add_get(REQUEST_UPLOAD_URL, get_upload_link_handler)
     app.router.add_put(UPLOAD_URL + '/{path_hash}', mock_upload_handler)
     app.router.add_get(DOWNLOAD_LINK_URL, mock_get_download_link_handler)
 
     app.router.add_get('/v1/disk/', disk_info_handler)
+    app.router.add_get(REMOTE_FILE_URL + '/{name}', remote_file_handler)
+    app.router.add_get(
+        SLOW_REMOTE_FILE_URL + '/{name}', slow_remote_file_handler
+    )
+    app.router.add_get(
+        REDIRECT_REMOTE_FILE_URL + '/{name}', redirect_remote_file_handler
+    )
     app.router.add_route('*', '/{tail:.*}', catch_all_handler)
 
     server = await aiohttp_server(app)
@@ -3,14 +3,30 @@ from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
 from settings import Config
+from .sql_profiler import SQLProfiler
 
-app = Flask(
-    __name__,
-    template_folder=Config.TEMPLATE_FOLDER,
-    static_folder=Config.STATIC_FOLDER,
-)
-app.config.from_object(Config)
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+db = SQLAlchemy()
+migrate = Migrate()
+sql_profiler = SQLProfiler()
 
-from . import views, models, forms, api_views
+
+def create_app(config_object=Config):
+    """Создает и настраивает экземпляр приложения."""
+    app = Flask(
+        __name__,
+        template_folder=config_object.TEMPLATE_FOLDER,
+        static_folder=config_object.STATIC_FOLDER,
+    )
+    app.config.from_object(config_object)
+    db.init_app(app)
+    migrate.init_app(app, db)
+    sql_profiler.init_app(app, db)
+
+    from . import api_views, error_handler, views
+    app.register_blueprint(views.bp)
+    app.register_blueprint(api_views.bp)
+    error_handler.register_error_handlers(app)
+    return app
+
+
+app = create_app()
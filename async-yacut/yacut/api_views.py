@@ -1,18 +1,74 @@
 from http import HTTPStatus
+from pathlib import PurePosixPath
+from urllib.parse import unquote, urlsplit
 
-from flask import jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
-from . import app
-from .constants import SHORT_ID_PATTERN
-from .error_handler import APIError, InvalidShortIDError
+from .caching import make_conditional
+from .chunked_uploads import (
+    completed_chunks,
+    create_upload,
+    discard_upload,
+    get_upload,
+    save_chunk,
+)
+from .constants import REMOTE_URL_SCHEMES, SAFE_FILE_EXTS, SHORT_ID_PATTERN
+from .error_handler import (
+    APIError,
+    InvalidShortIDError,
+    ShortIDConflictError,
+)
 from .models import URLMap
 
+bp = Blueprint('api', __name__)
+
 MISSING_BODY_MSG = 'Отсутствует тело запроса'
 MISSING_URL_MSG = '"url" является обязательным полем!'
 NOT_FOUND_MSG = 'Указанный id не найден'
+INVALID_REMOTE_URL_MSG = 'Поддерживаются только ссылки http и https'
+INVALID_FILE_EXT_MSG = 'Недопустимое расширение файла'
+FILE_EXISTS_MSG = 'Файл с таким именем уже существует.'
+REMOTE_UPLOAD_FAILED_MSG = 'Не удалось загрузить файл по ссылке'
+REMOTE_UPLOAD_TIMEOUT_MSG = 'Истекло время загрузки файла по ссылке'
+DISK_UPLOAD_FAILED_MSG = 'Не удалось загрузить файл на Я.Диск'
+INVALID_SIZE_MSG = '"size" должен быть положительным целым числом'
+SIZE_TOO_LARGE_MSG = '"size" не должен превышать {max_size} байт'
 
 
-@app.route('/api/id/', methods=['POST'])
+def _validate_custom_id(custom_id):
+    if custom_id and not SHORT_ID_PATTERN.match(str(custom_id).strip()):
+        raise APIError(
+            InvalidShortIDError.message,
+            HTTPStatus.BAD_REQUEST,
+        )
+
+
+def _clean_filename(filename):
+    """Проверяет имя загружаемого файла и его уникальность."""
+    filename = PurePosixPath(str(filename or '').strip()).name
+    if PurePosixPath(filename).suffix[1:].lower() not in SAFE_FILE_EXTS:
+        raise APIError(
+            INVALID_FILE_EXT_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    if URLMap.query.filter_by(original=filename).first():
+        raise APIError(
+            FILE_EXISTS_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    return filename
+
+
+def _clean_file_custom_id(data):
+    """Проверяет пользовательский идентификатор до загрузки файла."""
+    custom_id = str(data.get('custom_id') or '').strip() or None
+    _validate_custom_id(custom_id)
+    if custom_id and URLMap.is_short_taken(custom_id):
+        raise ShortIDConflictError(ShortIDConflictError.message)
+    return custom_id
+
+
+@bp.route('/api/id/', methods=['POST'])
 def create_short_id():
     """Создает короткую ссылку через API."""
     data = request.get_json(silent=True)
@@ -28,11 +84,7 @@ def create_short_id():
             HTTPStatus.BAD_REQUEST,
         )
     custom_id = data.get('custom_id')
-    if custom_id and not SHORT_ID_PATTERN.match(str(custom_id).strip()):
-        raise APIError(
-            InvalidShortIDError.message,
-            HTTPStatus.BAD_REQUEST,
-        )
+    _validate_custom_id(custom_id)
     url_map = URLMap.create_short_link(
         original=original,
         custom_id=custom_id,
@@ -40,7 +92,7 @@ def create_short_id():
     return jsonify(url_map.to_dict()), HTTPStatus.CREATED
 
 
-@app.route('/api/id/<string:short_id>/', methods=['GET'])
+@bp.route('/api/id/<string:short_id>/', methods=['GET'])
 def get_original_link(short_id):
     """Возвращает оригинальный URL по короткому идентификатору."""
     url_map = URLMap.get_by_short(short_id)
@@ -49,6 +101,152 @@ def get_original_link(short_id):
             NOT_FOUND_MSG,
             HTTPStatus.NOT_FOUND,
         )
+    return make_conditional(
+        jsonify(url_map.to_dict(include_short_link=False)),
+        url_map,
+        current_app.config['API_CACHE_MAX_AGE'],
+    )
+
+
+@bp.route('/api/files/', methods=['POST'])
+def create_file_link_from_url():
+    """Загружает файл по внешней ссылке на Я.Диск и сокращает ссылку."""
+    import asyncio
+
+    from aiohttp import ClientError
+
+    from .disk_operations import upload_from_url
+
+    data = request.get_json(silent=True)
+    if not data:
+        raise APIError(
+            MISSING_BODY_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    source_url = data.get('url')
+    if not source_url:
+        raise APIError(
+            MISSING_URL_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    if not isinstance(source_url, str):
+        raise APIError(
+            INVALID_REMOTE_URL_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    source_path = urlsplit(source_url)
+    if (
+        source_path.scheme not in REMOTE_URL_SCHEMES
+        or not source_path.hostname
+    ):
+        raise APIError(
+            INVALID_REMOTE_URL_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    filename = _clean_filename(
+        data.get('filename') or unquote(source_path.path)
+    )
+    custom_id = _clean_file_custom_id(data)
+    try:
+        current_app.ensure_sync(upload_from_url)(
+            source_url,
+            filename,
+            timeout=current_app.config['REMOTE_UPLOAD_TIMEOUT'],
+            allow_private=current_app.config['REMOTE_UPLOAD_ALLOW_PRIVATE'],
+        )
+    except asyncio.TimeoutError:
+        raise APIError(
+            REMOTE_UPLOAD_TIMEOUT_MSG,
+            HTTPStatus.GATEWAY_TIMEOUT,
+        )
+    except (KeyError, ClientError) as error:
+        # Текст ошибки aiohttp не показывается клиенту, только в логе.
+        current_app.logger.warning(
+            'Загрузка по ссылке %s не удалась: %r', source_url, error
+        )
+        raise APIError(
+            REMOTE_UPLOAD_FAILED_MSG,
+            HTTPStatus.BAD_GATEWAY,
+        )
+    url_map = URLMap.create_short_link(
+        original=filename,
+        custom_id=custom_id,
+        is_file=True,
+    )
+    return jsonify(url_map.to_dict()), HTTPStatus.CREATED
+
+
+@bp.route('/api/files/uploads/', methods=['POST'])
+def init_chunked_upload():
+    """Начинает загрузку файла по частям."""
+    data = request.get_json(silent=True)
+    if not data:
+        raise APIError(
+            MISSING_BODY_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    filename = _clean_filename(data.get('filename'))
+    size = data.get('size')
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise APIError(
+            INVALID_SIZE_MSG,
+            HTTPStatus.BAD_REQUEST,
+        )
+    max_size = current_app.config['UPLOAD_MAX_SIZE']
+    if size > max_size:
+        raise APIError(
+            SIZE_TOO_LARGE_MSG.format(max_size=max_size),
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        )
+    return jsonify(create_upload(filename, size)), HTTPStatus.CREATED
+
+
+@bp.route('/api/files/uploads/<string:upload_id>/', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """Возвращает состояние загрузки для ее возобновления."""
+    return jsonify(get_upload(upload_id)), HTTPStatus.OK
+
+
+@bp.route(
+    '/api/files/uploads/<string:upload_id>/<int:index>/',
+    methods=['PUT'],
+)
+def put_upload_chunk(upload_id, index):
+    """Принимает очередной фрагмент файла в теле запроса."""
     return jsonify(
-        url_map.to_dict(include_short_link=False),
+        save_chunk(upload_id, index, request.stream),
     ), HTTPStatus.OK
+
+
+@bp.route(
+    '/api/files/uploads/<string:upload_id>/complete/',
+    methods=['POST'],
+)
+def complete_chunked_upload(upload_id):
+    """Отправляет фрагменты файла на Я.Диск и сокращает ссылку на него."""
+    from aiohttp import ClientError
+
+    from .disk_operations import upload_parts
+
+    data = request.get_json(silent=True) or {}
+    upload = get_upload(upload_id)
+    filename = _clean_filename(upload['filename'])
+    custom_id = _clean_file_custom_id(data)
+    try:
+        current_app.ensure_sync(upload_parts)(
+            filename,
+            completed_chunks(upload_id),
+            upload['size'],
+        )
+    except (KeyError, ClientError) as error:
+        raise APIError(
+            f'{DISK_UPLOAD_FAILED_MSG}: {error}',
+            HTTPStatus.BAD_GATEWAY,
+        )
+    discard_upload(upload_id)
+    url_map = URLMap.create_short_link(
+        original=filename,
+        custom_id=custom_id,
+        is_file=True,
+    )
+    return jsonify(url_map.to_dict()), HTTPStatus.CREATED
@@ -0,0 +1,26 @@
+from hashlib import sha1
+
+from flask import request
+
+
+def url_map_etag(url_map):
+    """Строит ETag короткой ссылки: запись неизменяема после создания."""
+    source = f'{url_map.short}:{url_map.original}:{url_map.timestamp}'
+    return sha1(source.encode()).hexdigest()
+
+
+def set_cache_control(response, max_age):
+    """Разрешает кешировать ответ прокси и браузерам на max_age секунд."""
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
+def make_conditional(response, url_map, max_age):
+    """Добавляет ETag/Last-Modified и отвечает 304 на условный запрос."""
+    response.set_etag(url_map_etag(url_map))
+    if url_map.timestamp:
+        response.last_modified = url_map.timestamp
+    set_cache_control(response, max_age)
+    return response.make_conditional(request)
@@ -0,0 +1,134 @@
+import json
+import math
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from flask import current_app
+
+from .error_handler import (
+    IncompleteUploadError,
+    InvalidChunkError,
+    UploadNotFoundError,
+)
+
+META_FILENAME = 'meta.json'
+CHUNK_SUFFIX = '.part'
+COPY_BUFFER_SIZE = 64 * 1024
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _uploads_root():
+    """Возвращает каталог для временных фрагментов загрузок."""
+    root = Path(current_app.config['UPLOADS_TMP_DIR'])
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _upload_dir(upload_id):
+    """Возвращает каталог существующей загрузки."""
+    if not UPLOAD_ID_PATTERN.match(upload_id):
+        raise UploadNotFoundError()
+    path = _uploads_root() / upload_id
+    if not (path / META_FILENAME).is_file():
+        raise UploadNotFoundError()
+    return path
+
+
+def _chunk_path(upload_dir, index):
+    return upload_dir / f'{index:08d}{CHUNK_SUFFIX}'
+
+
+def _read_meta(upload_dir):
+    """Читает описание загрузки и список принятых фрагментов."""
+    meta = json.loads(
+        (upload_dir / META_FILENAME).read_text(encoding='utf-8')
+    )
+    meta['received'] = sorted(
+        int(path.stem) for path in upload_dir.glob(f'*{CHUNK_SUFFIX}')
+    )
+    return meta
+
+
+def _expected_chunk_length(meta, index):
+    if index == meta['chunks'] - 1:
+        return meta['size'] - index * meta['chunk_size']
+    return meta['chunk_size']
+
+
+def remove_stale_uploads():
+    """Удаляет незавершенные загрузки старше UPLOAD_TTL."""
+    deadline = time.time() - current_app.config['UPLOAD_TTL']
+    for path in _uploads_root().iterdir():
+        if path.is_dir() and path.stat().st_mtime < deadline:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def create_upload(filename, size):
+    """Регистрирует новую загрузку и возвращает ее описание."""
+    remove_stale_uploads()
+    chunk_size = current_app.config['UPLOAD_CHUNK_SIZE']
+    meta = {
+        'upload_id': uuid.uuid4().hex,
+        'filename': filename,
+        'size': size,
+        'chunk_size': chunk_size,
+        'chunks': math.ceil(size / chunk_size),
+    }
+    upload_dir = _uploads_root() / meta['upload_id']
+    upload_dir.mkdir()
+    (upload_dir / META_FILENAME).write_text(
+        json.dumps(meta),
+        encoding='utf-8',
+    )
+    meta['received'] = []
+    return meta
+
+
+def get_upload(upload_id):
+    """Возвращает описание загрузки с уже принятыми фрагментами."""
+    return _read_meta(_upload_dir(upload_id))
+
+
+def save_chunk(upload_id, index, stream):
+    """Сохраняет фрагмент из потока запроса, не читая его целиком."""
+    upload_dir = _upload_dir(upload_id)
+    meta = _read_meta(upload_dir)
+    if not 0 <= index < meta['chunks']:
+        raise InvalidChunkError()
+    expected = _expected_chunk_length(meta, index)
+    tmp_path = upload_dir / f'{index:08d}.{uuid.uuid4().hex}.tmp'
+    written = 0
+    with tmp_path.open('wb') as target:
+        while written <= expected:
+            data = stream.read(min(COPY_BUFFER_SIZE, expected - written + 1))
+            if not data:
+                break
+            written += len(data)
+            target.write(data)
+    if written != expected:
+        tmp_path.unlink(missing_ok=True)
+        raise InvalidChunkError()
+    os.replace(tmp_path, _chunk_path(upload_dir, index))
+    return _read_meta(upload_dir)
+
+
+def completed_chunks(upload_id):
+    """Возвращает пути фрагментов завершенной загрузки по порядку.
+
+    Фрагменты не склеиваются во второй файл: их читают один за другим
+    прямо при отправке на Я.Диск.
+    """
+    upload_dir = _upload_dir(upload_id)
+    meta = _read_meta(upload_dir)
+    if len(meta['received']) != meta['chunks']:
+        raise IncompleteUploadError()
+    return [_chunk_path(upload_dir, index) for index in range(meta['chunks'])]
+
+
+def discard_upload(upload_id):
+    """Удаляет все временные файлы загрузки."""
+    shutil.rmtree(_upload_dir(upload_id), ignore_errors=True)
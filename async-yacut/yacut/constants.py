@@ -1,3 +1,5 @@
+import json
+import os
 import re
 import string
 
@@ -16,3 +18,13 @@ SHORT_ID_REGEX = (
     rf'{{1,{CUSTOM_ID_LENGTH}}}$'
 )
 SHORT_ID_PATTERN = re.compile(SHORT_ID_REGEX)
+
+DEFAULT_SAFE_FILE_EXTS = [
+    'png', 'jpg', 'jpeg', 'gif', 'webp',
+    'pdf', 'txt', 'csv', 'docx', 'xlsx',
+    'pptx', 'zip', 'rar',
+]
+SAFE_FILE_EXTS = set(json.loads(
+    os.getenv('SAFE_FILE_EXTS', json.dumps(DEFAULT_SAFE_FILE_EXTS))
+))
+REMOTE_URL_SCHEMES = {'http', 'https'}
@@ -1,10 +1,16 @@
+import ipaddress
 import os
+import socket
+from urllib.parse import urlsplit
 
 import aiohttp
 import requests
 from aiohttp import ClientError
+from aiohttp.abc import AbstractResolver
 from dotenv import load_dotenv
 
+from .error_handler import ForbiddenRemoteAddressError
+
 load_dotenv()
 
 DISK_FILES_DIR = 'disk:/Приложения/Uploader/'
@@ -14,6 +20,8 @@ API_VERSION = 'v1'
 DISK_INFO_URL = f'{API_HOST}{API_VERSION}/disk/'
 REQUEST_UPLOAD_URL = f'{API_HOST}{API_VERSION}/disk/resources/upload'
 DOWNLOAD_LINK_URL = f'{API_HOST}{API_VERSION}/disk/resources/download'
+STREAM_CHUNK_SIZE = 64 * 1024
+REMOTE_CONNECT_TIMEOUT = 10
 
 AUTH_HEADERS = {
     'Authorization': f'OAuth {DISK_TOKEN}'
@@ -57,11 +65,88 @@ async def _upload_to_disk(session, upload_url, file_storage):
     stream = getattr(file_storage, 'stream', file_storage)
     if hasattr(stream, 'seek'):
         stream.seek(0)
-    data = stream.read()
-    async with session.put(upload_url, data=data) as response:
+    async with session.put(upload_url, data=stream) as response:
         response.raise_for_status()
 
 
+async def _read_files(paths):
+    """Читает файлы один за другим блоками STREAM_CHUNK_SIZE."""
+    for path in paths:
+        with open(path, 'rb') as source:
+            while data := source.read(STREAM_CHUNK_SIZE):
+                yield data
+
+
+def _check_public_address(address):
+    """Запрещает адреса локальной сети, loopback и служебные диапазоны."""
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if not ip.is_global or ip.is_multicast:
+        raise ForbiddenRemoteAddressError()
+
+
+class PublicAddressResolver(AbstractResolver):
+    """Резолвер, который пропускает только публичные адреса.
+
+    Проверяется каждый адрес, с которым будет установлено соединение,
+    поэтому подмена DNS между проверкой и запросом ничего не дает.
+    """
+
+    def __init__(self):
+        self._resolver = aiohttp.DefaultResolver()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        hosts = await self._resolver.resolve(host, port, family)
+        for item in hosts:
+            _check_public_address(item['host'])
+        return hosts
+
+    async def close(self):
+        await self._resolver.close()
+
+
+def _check_literal_host(source_url):
+    """Проверяет хост-IP: для таких хостов aiohttp не вызывает резолвер."""
+    host = urlsplit(source_url).hostname or ''
+    try:
+        ipaddress.ip_address(host.split('%', 1)[0])
+    except ValueError:
+        return
+    _check_public_address(host)
+
+
+async def _stream_remote_to_disk(session, source_session, source_url,
+                                 filename):
+    """Потоковая передача файла по внешней ссылке на Я.Диск.
+
+    Ссылка для загрузки запрашивается только после ответа внешнего
+    сервера. Перенаправления не выполняются: иначе ответ внешнего сервера
+    мог бы увести запрос на внутренний адрес в обход проверки.
+    """
+    async with source_session.get(
+        source_url, allow_redirects=False
+    ) as source:
+        source.raise_for_status()
+        if source.status >= 300:
+            raise aiohttp.ClientResponseError(
+                source.request_info,
+                source.history,
+                status=source.status,
+                message='перенаправления не поддерживаются',
+                headers=source.headers,
+            )
+        upload_url = await _request_upload_link(session, filename)
+        headers = {}
+        content_length = source.headers.get('Content-Length')
+        if content_length:
+            headers['Content-Length'] = content_length
+        async with session.put(
+            upload_url,
+            data=source.content.iter_chunked(STREAM_CHUNK_SIZE),
+            headers=headers,
+        ) as response:
+            response.raise_for_status()
+
+
 async def _request_download_link(session, filename):
     """Получение ссылки на скачивание загруженного файла."""
     full_path = f'{DISK_FILES_DIR}{filename}'
@@ -105,3 +190,47 @@ async def upload_file(file_storage_list: list) -> dict:
             filename, value = upload_result
             results[filename] = value
     return results
+
+
+async def upload_from_url(
+    source_url: str,
+    filename: str,
+    timeout: float | None = None,
+    allow_private: bool = False,
+) -> str:
+    """Загрузка файла по внешней ссылке на Я.Диск без буферизации.
+
+    Внешний файл запрашивается только с публичных адресов, если не передан
+    allow_private; timeout ограничивает всю загрузку в секундах.
+    """
+    client_timeout = aiohttp.ClientTimeout(
+        total=timeout, sock_connect=REMOTE_CONNECT_TIMEOUT
+    )
+    connector = None
+    if not allow_private:
+        _check_literal_host(source_url)
+        connector = aiohttp.TCPConnector(resolver=PublicAddressResolver())
+    async with aiohttp.ClientSession(
+        timeout=client_timeout
+    ) as session, aiohttp.ClientSession(
+        connector=connector, timeout=client_timeout
+    ) as source_session:
+        await _stream_remote_to_disk(
+            session, source_session, source_url, filename
+        )
+        await _request_download_link(session, filename)
+    return filename
+
+
+async def upload_parts(filename: str, paths: list, size: int) -> str:
+    """Загрузка файла, сохраненного фрагментами, на Я.Диск одним PUT."""
+    async with aiohttp.ClientSession() as session:
+        upload_url = await _request_upload_link(session, filename)
+        async with session.put(
+            upload_url,
+            data=_read_files(paths),
+            headers={'Content-Length': str(size)},
+        ) as response:
+            response.raise_for_status()
+        await _request_download_link(session, filename)
+    return filename
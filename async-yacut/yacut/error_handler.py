@@ -2,8 +2,6 @@ from http import HTTPStatus
 
 from flask import jsonify
 
-from . import app
-
 
 class APIError(Exception):
     status_code = HTTPStatus.BAD_REQUEST
@@ -28,13 +26,34 @@ class ShortIDConflictError(APIError):
     message = 'Предложенный вариант короткой ссылки уже существует.'
 
 
-@app.errorhandler(APIError)
+class UploadNotFoundError(APIError):
+    status_code = HTTPStatus.NOT_FOUND
+    message = 'Загрузка с указанным id не найдена'
+
+
+class InvalidChunkError(APIError):
+    message = 'Некорректный фрагмент файла'
+
+
+class IncompleteUploadError(APIError):
+    message = 'Загружены не все фрагменты файла'
+
+
+class ForbiddenRemoteAddressError(APIError):
+    message = 'Ссылка указывает на недопустимый адрес'
+
+
 def handle_api_error(error):
     """Возвращает JSON-ответ для ошибок API."""
     return jsonify(error.to_dict()), error.status_code
 
 
-@app.errorhandler(HTTPStatus.NOT_FOUND)
 def handle_not_found(_error):
     """Возвращает JSON-ответ для 404."""
     return jsonify({'message': 'Страница не найдена'}), HTTPStatus.NOT_FOUND
+
+
+def register_error_handlers(app):
+    """Подключает обработчики ошибок к приложению."""
+    app.register_error_handler(APIError, handle_api_error)
+    app.register_error_handler(HTTPStatus.NOT_FOUND, handle_not_found)
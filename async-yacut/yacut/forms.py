@@ -1,5 +1,3 @@
-import json
-import os
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileAllowed, MultipleFileField
 from wtforms import StringField, SubmitField
@@ -14,18 +12,10 @@ from wtforms.validators import (
 from .constants import (
     CUSTOM_ID_LENGTH,
     MAX_ORIGINAL_URL_LENGTH,
+    SAFE_FILE_EXTS,
     SHORT_ID_PATTERN,
 )
 
-DEFAULT_SAFE_FILE_EXTS = [
-    'png', 'jpg', 'jpeg', 'gif', 'webp',
-    'pdf', 'txt', 'csv', 'docx', 'xlsx',
-    'pptx', 'zip', 'rar',
-]
-SAFE_FILE_EXTS = set(json.loads(
-    os.getenv('SAFE_FILE_EXTS', json.dumps(DEFAULT_SAFE_FILE_EXTS))
-))
-
 
 class ShortLinkToLinkForm(FlaskForm):
     """Форма для главной страницы"""
@@ -11,7 +11,7 @@ from .constants import (
     SYMBOLS,
 )
 from .error_handler import ShortIDConflictError
-from yacut import db
+from . import db
 
 
 class URLMap(db.Model):
@@ -32,7 +32,7 @@ class URLMap(db.Model):
         data = {'url': self.original}
         if include_short_link:
             data['short_link'] = url_for(
-                'redirect_view',
+                'views.redirect_view',
                 short=self.short,
                 _external=True,
             )
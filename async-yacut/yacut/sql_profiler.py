@@ -0,0 +1,162 @@
+import heapq
+import hmac
+import threading
+import time
+from http import HTTPStatus
+
+from flask import (
+    abort, current_app, g, has_app_context, jsonify, request,
+)
+from sqlalchemy import event
+
+STATS_URL = '/api/debug/sql/'
+TOKEN_HEADER = 'X-SQL-Profiler-Token'
+UNMATCHED_ENDPOINT = '<unmatched>'
+
+
+class SQLProfiler:
+    """Считает SQL-запросы и их время для каждого HTTP-запроса.
+
+    Слушатели событий движка и хуки запросов подключаются только при
+    SQL_PROFILER_ENABLED, поэтому в обычном режиме накладных расходов нет.
+    """
+
+    def __init__(self, app=None, db=None):
+        self._lock = threading.Lock()
+        self._stats = {}
+        if app is not None and db is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        if not app.config.get('SQL_PROFILER_ENABLED'):
+            return
+        with app.app_context():
+            engine = db.engine
+        event.listen(
+            engine, 'before_cursor_execute', self._before_cursor_execute
+        )
+        event.listen(
+            engine, 'after_cursor_execute', self._after_cursor_execute
+        )
+        event.listen(engine, 'handle_error', self._handle_error)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule(STATS_URL, 'sql_profiler_stats', self.stats_view)
+        app.extensions['sql_profiler'] = self
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters,
+                               context, executemany):
+        conn.info.setdefault('query_start_time', []).append(
+            time.perf_counter()
+        )
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters,
+                              context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        if has_app_context() and 'sql_queries' in g:
+            g.sql_queries.append((elapsed, statement))
+
+    @staticmethod
+    def _handle_error(context):
+        # after_cursor_execute не вызывается для упавшего запроса: время
+        # начала иначе осталось бы в соединении пула навсегда.
+        connection = context.connection
+        if connection is not None and connection.info.get(
+            'query_start_time'
+        ):
+            connection.info['query_start_time'].pop()
+
+    @staticmethod
+    def _start_request():
+        g.sql_queries = []
+        g.sql_request_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        queries = g.pop('sql_queries', None)
+        if queries is None:
+            return response
+        duration = time.perf_counter() - g.pop('sql_request_started')
+        sql_time = sum(elapsed for elapsed, _ in queries)
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        self._record(endpoint, len(queries), sql_time, duration)
+        response.headers['X-SQL-Queries'] = str(len(queries))
+        response.headers['X-SQL-Time'] = f'{sql_time * 1000:.1f}'
+        if duration * 1000 >= current_app.config['SQL_SLOW_REQUEST_MS']:
+            slowest = heapq.nlargest(
+                current_app.config['SQL_PROFILER_TOP'],
+                queries,
+                key=lambda query: query[0],
+            )
+            current_app.logger.warning(
+                'Медленный запрос %s %s: %.1f ms, SQL-запросов: %d '
+                '(%.1f ms). Самые медленные: %s',
+                request.method,
+                request.path,
+                duration * 1000,
+                len(queries),
+                sql_time * 1000,
+                '; '.join(
+                    f'{elapsed * 1000:.1f} ms {statement}'
+                    for elapsed, statement in slowest
+                ),
+            )
+        return response
+
+    def _record(self, endpoint, query_count, sql_time, duration):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'sql_time': 0.0,
+                'request_time': 0.0,
+            })
+            stats['requests'] += 1
+            stats['queries'] += query_count
+            stats['max_queries'] = max(stats['max_queries'], query_count)
+            stats['sql_time'] += sql_time
+            stats['request_time'] += duration
+
+    def get_stats(self):
+        """Возвращает агрегированную статистику по эндпоинтам."""
+        with self._lock:
+            snapshot = {
+                endpoint: dict(stats)
+                for endpoint, stats in self._stats.items()
+            }
+        return {
+            endpoint: {
+                'requests': stats['requests'],
+                'queries': stats['queries'],
+                'max_queries': stats['max_queries'],
+                'avg_queries': stats['queries'] / stats['requests'],
+                'avg_sql_time_ms': (
+                    stats['sql_time'] * 1000 / stats['requests']
+                ),
+                'avg_request_time_ms': (
+                    stats['request_time'] * 1000 / stats['requests']
+                ),
+            }
+            for endpoint, stats in snapshot.items()
+        }
+
+    @staticmethod
+    def _stats_allowed():
+        if current_app.debug:
+            return True
+        token = current_app.config.get('SQL_PROFILER_TOKEN')
+        return bool(token) and hmac.compare_digest(
+            request.headers.get(TOKEN_HEADER, ''), token
+        )
+
+    def stats_view(self):
+        """Отдает статистику SQL-запросов по эндпоинтам.
+
+        Доступна в режиме отладки или по заголовку X-SQL-Profiler-Token,
+        совпадающему с SQL_PROFILER_TOKEN; остальным отвечает 404.
+        """
+        if not self._stats_allowed():
+            abort(HTTPStatus.NOT_FOUND)
+        return jsonify(self.get_stats()), HTTPStatus.OK
@@ -1,6 +1,7 @@
-import requests
 from http import HTTPStatus
+
 from flask import (
+    Blueprint,
     render_template,
     redirect,
     request,
@@ -8,17 +9,19 @@ from flask import (
     current_app,
 )
 
-from . import app
+from .caching import set_cache_control
 from .constants import FILES_ROUTE
-from .disk_operations import upload_file, get_download_link_to_file
 from .error_handler import InvalidShortIDError, ShortIDConflictError
-from .forms import ShortLinkToLinkForm, ShortLinkToFileForm
 from .models import URLMap
 
+bp = Blueprint('views', __name__)
+
 
-@app.route('/', methods=['GET', 'POST'])
+@bp.route('/', methods=['GET', 'POST'])
 def index_view():
     """Обрабатывает форму на главной странице."""
+    from .forms import ShortLinkToLinkForm
+
     form = ShortLinkToLinkForm()
     result_messages = []
     info_messages = []
@@ -78,9 +81,12 @@ def index_view():
     )
 
 
-@app.route(f'/{FILES_ROUTE}', methods=['GET', 'POST'])
+@bp.route(f'/{FILES_ROUTE}', methods=['GET', 'POST'])
 def files_view():
     """Обрабатывает загрузку файлов на страницу /files."""
+    from .disk_operations import upload_file
+    from .forms import ShortLinkToFileForm
+
     form = ShortLinkToFileForm()
     result_links = []
     error_messages = []
@@ -141,7 +147,7 @@ def files_view():
     )
 
 
-@app.route('/<string:short>')
+@bp.route('/<string:short>')
 def redirect_view(short):
     """Выполняет переадресацию по короткой ссылке.
 
@@ -152,6 +158,10 @@ def redirect_view(short):
     """
     link_obj = URLMap.query.filter_by(short=short).first_or_404()
     if link_obj.is_file:
+        import requests
+
+        from .disk_operations import get_download_link_to_file
+
         href = get_download_link_to_file(link_obj.original)
         remote_resp = requests.get(href, stream=True)
         remote_resp.raise_for_status()
@@ -171,4 +181,11 @@ def redirect_view(short):
             headers=headers,
             status=HTTPStatus.OK,
         )
-    return redirect(link_obj.original, code=HTTPStatus.FOUND)
+    if current_app.config['PERMANENT_REDIRECTS']:
+        code = HTTPStatus.MOVED_PERMANENTLY
+    else:
+        code = HTTPStatus.FOUND
+    return set_cache_control(
+        redirect(link_obj.original, code=code),
+        current_app.config['REDIRECT_CACHE_MAX_AGE'],
+    )
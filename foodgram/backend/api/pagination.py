@@ -1,4 +1,13 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from config.constants import DEFAULT_PAGE_SIZE
 
@@ -6,3 +15,125 @@ from config.constants import DEFAULT_PAGE_SIZE
 class LimitPageNumberPagination(PageNumberPagination):
     page_size = DEFAULT_PAGE_SIZE
     page_size_query_param = "limit"
+
+
+class KeysetPagination(LimitPageNumberPagination):
+    """Постраничная выдача по ключу (keyset) с переходом на номера страниц.
+
+    Режим включается параметром ``cursor`` (для первой страницы — пустым).
+    Следующая страница выбирается условием по полям ``ordering`` вместо
+    OFFSET, поэтому время ответа не растет с глубиной. COUNT(*) в этом
+    режиме выполняется только по запросу ``count=true``. Без ``cursor``
+    работает обычная пагинация по номерам страниц.
+    """
+
+    ordering = ("-id",)
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Некорректный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = self.cursor_query_param in request.query_params
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.display_page_controls = False
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, queryset.model)
+        queryset = queryset.order_by(*self.ordering)
+        self.count = None
+        if self._to_bool(request.query_params.get(self.count_query_param)):
+            self.count = queryset.count()
+        try:
+            if position is not None:
+                queryset = queryset.filter(self._after_position(position))
+            page = list(queryset[: page_size + 1])
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        self.has_next = len(page) > page_size
+        self.page_items = page[:page_size]
+        return self.page_items
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        payload = {"next": self.get_next_link(), "results": data}
+        if self.count is not None:
+            payload = {"count": self.count, **payload}
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        last = self.page_items[-1]
+        position = [
+            self._serialize(getattr(last, field.lstrip("-")))
+            for field in self.ordering
+        ]
+        return replace_query_param(
+            remove_query_param(url, self.count_query_param),
+            self.cursor_query_param,
+            self.encode_cursor(position),
+        )
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, request, model):
+        """Позиция из курсора, приведенная к типам полей ``ordering``."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def _after_position(self, position):
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        first = self.ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        # Нестрогая граница по первому полю позволяет БД сканировать
+        # диапазон индекса вместо разбора всего OR-условия.
+        return Q(**{f"{first.lstrip('-')}__{bound}": position[0]}) & condition
+
+    @staticmethod
+    def _serialize(value):
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
+    @staticmethod
+    def _to_bool(value):
+        return str(value).strip().lower() in {"1", "true", "yes"}
+
+
+class RecipeFeedPagination(KeysetPagination):
+    ordering = ("-pub_date", "-id")
+
+
+class SubscriptionsPagination(KeysetPagination):
+    ordering = ("id",)
@@ -1,10 +1,58 @@
+from django.db.models import Exists, OuterRef
+from django.utils.choices import CallableChoiceIterator
 from django_filters.rest_framework import FilterSet
 from django_filters.rest_framework.filters import (
-    AllValuesMultipleFilter,
+    BaseInFilter,
     BooleanFilter,
     CharFilter,
+    MultipleChoiceFilter,
     NumberFilter,
 )
+from rest_framework.filters import BaseFilterBackend
+
+from recipes.models import Recipe
+from recipes.pantry_index import filter_cookable
+from recipes.reference_cache import get_tag_ids_by_slug
+from recipes.search import search_recipes
+
+
+def tag_slug_choices():
+    return [(slug, slug) for slug in get_tag_ids_by_slug()]
+
+
+class TagSlugFilter(MultipleChoiceFilter):
+    """Фильтр рецептов по слагам тегов (любой из переданных).
+
+    Допустимые слаги и их id берутся из кеша справочника тегов, а
+    фильтрация выполняется подзапросом EXISTS по промежуточной таблице,
+    поэтому строки рецептов не дублируются и DISTINCT не нужен.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault(
+            "choices", CallableChoiceIterator(tag_slug_choices)
+        )
+        kwargs.setdefault("distinct", False)
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        tag_ids = get_tag_ids_by_slug()
+        return qs.filter(
+            Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe_id=OuterRef("pk"),
+                    tag_id__in=[
+                        tag_ids[slug] for slug in value if slug in tag_ids
+                    ],
+                )
+            )
+        )
+
+
+class NumberInFilter(BaseInFilter, NumberFilter):
+    pass
 
 
 class IngredientFilter(FilterSet):
@@ -17,10 +65,12 @@ class IngredientFilter(FilterSet):
 
 
 class RecipeFilter(FilterSet):
-    tags = AllValuesMultipleFilter(field_name="tags__slug")
+    tags = TagSlugFilter()
     author = NumberFilter(field_name="author_id")
     is_favorited = BooleanFilter(method="filter_favorited")
     is_in_shopping_cart = BooleanFilter(method="filter_in_cart")
+    have_ingredients = NumberInFilter(method="filter_have_ingredients")
+    max_missing = NumberFilter(method="filter_max_missing", min_value=0)
 
     def filter_favorited(self, qs, name, value):
         user = getattr(self.request, "user", None)
@@ -33,3 +83,27 @@ class RecipeFilter(FilterSet):
         if value and user and user.is_authenticated:
             return qs.filter(in_carts__user=user)
         return qs
+
+    def filter_have_ingredients(self, qs, name, value):
+        if not value:
+            return qs
+        max_missing = self.form.cleaned_data.get("max_missing") or 0
+        return filter_cookable(
+            qs, [int(pk) for pk in value], int(max_missing)
+        )
+
+    def filter_max_missing(self, qs, name, value):
+        # Учитывается в filter_have_ingredients.
+        return qs
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по параметру ``search`` (см. recipes.search)."""
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return search_recipes(queryset, query)
@@ -1,16 +1,16 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from api.utils.images import decode_data_uri_image
-from recipes.models import (
-    Favorite,
-    Ingredient,
-    IngredientAmount,
-    Recipe,
-    ShoppingCart,
-    Tag,
+from api.utils.fields import (
+    BulkPrimaryKeyRelatedField,
+    BulkRelatedListSerializer,
 )
-from users.models import Subscription
+from api.utils.images import decode_data_uri_image, image_variant_urls
+from api.utils.subscriptions import get_subscribed_author_ids
+from config.constants import RELATION_BATCH_MAX_SIZE
+from recipes.models import Ingredient, IngredientAmount, Recipe, Tag
+from recipes.pantry_index import pantry_index
+from recipes.shopping_list import refresh_recipe
 
 
 RECIPE_ALLOWED_MIME = {
@@ -35,6 +35,7 @@ class IngredientSerializer(serializers.ModelSerializer):
 class AuthorSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
     avatar = serializers.SerializerMethodField(read_only=True)
+    avatar_variants = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = get_user_model()
@@ -46,18 +47,13 @@ class AuthorSerializer(serializers.ModelSerializer):
             "last_name",
             "is_subscribed",
             "avatar",
+            "avatar_variants",
         )
 
     def get_is_subscribed(self, obj):
         request = self.context.get("request")
         return bool(
-            request
-            and getattr(request, "user", None)
-            and request.user.is_authenticated
-            and Subscription.objects.filter(
-                user=request.user,
-                author=obj,
-            ).exists()
+            request and obj.pk in get_subscribed_author_ids(request)
         )
 
     def get_avatar(self, obj):
@@ -67,6 +63,11 @@ class AuthorSerializer(serializers.ModelSerializer):
         url = obj.avatar.url
         return request.build_absolute_uri(url) if request else url
 
+    def get_avatar_variants(self, obj):
+        return image_variant_urls(
+            obj.avatar, obj.avatar_variants_ready, self.context.get("request")
+        )
+
 
 class RecipeIngredientReadSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(source="ingredient.id", read_only=True)
@@ -83,10 +84,11 @@ class RecipeIngredientReadSerializer(serializers.ModelSerializer):
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        fields = ("id", "name", "image", "cooking_time")
+        fields = ("id", "name", "image", "image_variants", "cooking_time")
 
     def get_image(self, obj):
         if not obj.image:
@@ -95,6 +97,18 @@ class RecipeMinifiedSerializer(serializers.ModelSerializer):
         url = obj.image.url
         return request.build_absolute_uri(url) if request else url
 
+    def get_image_variants(self, obj):
+        return image_variant_urls(
+            obj.image, obj.image_variants_ready, self.context.get("request")
+        )
+
+
+class SimilarRecipeSerializer(RecipeMinifiedSerializer):
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(RecipeMinifiedSerializer.Meta):
+        fields = RecipeMinifiedSerializer.Meta.fields + ("score",)
+
 
 class RecipeListSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
@@ -107,6 +121,7 @@ class RecipeListSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -119,11 +134,15 @@ class RecipeListSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
             "name",
             "image",
+            "image_variants",
             "text",
             "cooking_time",
         )
 
     def get_is_favorited(self, obj):
+        annotated = getattr(obj, "is_favorited", None)
+        if annotated is not None:
+            return bool(annotated)
         request = self.context.get("request")
         return bool(
             request
@@ -133,6 +152,9 @@ class RecipeListSerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, obj):
+        annotated = getattr(obj, "is_in_shopping_cart", None)
+        if annotated is not None:
+            return bool(annotated)
         request = self.context.get("request")
         return bool(
             request
@@ -148,9 +170,14 @@ class RecipeListSerializer(serializers.ModelSerializer):
         url = obj.image.url
         return request.build_absolute_uri(url) if request else url
 
+    def get_image_variants(self, obj):
+        return image_variant_urls(
+            obj.image, obj.image_variants_ready, self.context.get("request")
+        )
+
 
 class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
+    id = BulkPrimaryKeyRelatedField(
         source="ingredient",
         queryset=Ingredient.objects.all(),
     )
@@ -158,11 +185,12 @@ class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = IngredientAmount
         fields = ("id", "amount")
+        list_serializer_class = BulkRelatedListSerializer
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
     author = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all(),
     )
@@ -233,8 +261,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             })
         return attrs
 
-    def _apply_ingredients(self, recipe: Recipe, items):
-        IngredientAmount.objects.filter(recipe=recipe).delete()
+    def _create_ingredients(self, recipe: Recipe, items):
         data = [
             IngredientAmount(
                 recipe=recipe,
@@ -250,49 +277,93 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         tags = validated_data.pop("tags")
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
-        self._apply_ingredients(recipe, ingredients)
+        self._create_ingredients(recipe, ingredients)
+        pantry_index.refresh_recipe(recipe.pk)
+        recipe.is_favorited = False
+        recipe.is_in_shopping_cart = False
         return recipe
 
+    def _sync_ingredients(self, recipe: Recipe, items):
+        """Приводит состав рецепта к items, меняя только отличия.
+
+        Возвращает id ингредиентов, которые добавлены, удалены или
+        изменили количество, и признак изменения набора ингредиентов.
+        """
+        stored = {
+            row.ingredient_id: row
+            for row in IngredientAmount.objects.filter(recipe=recipe)
+        }
+        submitted = {item["ingredient"].pk: item["amount"] for item in items}
+        removed = stored.keys() - submitted.keys()
+        added = submitted.keys() - stored.keys()
+        changed = [
+            row
+            for ingredient_id, row in stored.items()
+            if ingredient_id in submitted
+            and row.amount != submitted[ingredient_id]
+        ]
+        if removed:
+            IngredientAmount.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        if changed:
+            for row in changed:
+                row.amount = submitted[row.ingredient_id]
+            IngredientAmount.objects.bulk_update(changed, ["amount"])
+        if added:
+            IngredientAmount.objects.bulk_create(
+                IngredientAmount(
+                    recipe=recipe,
+                    ingredient_id=ingredient_id,
+                    amount=submitted[ingredient_id],
+                )
+                for ingredient_id in added
+            )
+        touched = removed | added | {row.ingredient_id for row in changed}
+        return touched, bool(removed or added)
+
     def update(self, instance: Recipe, validated_data):
         ingredients = validated_data.pop("ingredients")
         tags = validated_data.pop("tags")
         instance = super().update(instance, validated_data)
+        # set() сам сравнивает с текущими тегами и пишет только разницу.
         instance.tags.set(tags)
-        self._apply_ingredients(instance, ingredients)
+        touched, composition_changed = self._sync_ingredients(
+            instance, ingredients
+        )
+        if touched:
+            refresh_recipe(instance.pk, touched)
+        if composition_changed:
+            pantry_index.refresh_recipe(instance.pk)
         return instance
 
     def to_representation(self, instance):
         return RecipeListSerializer(instance, context=self.context).data
 
 
-class _BaseRelationWriteSerializer(serializers.ModelSerializer):
-    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+class RelationBatchSerializer(serializers.Serializer):
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=RELATION_BATCH_MAX_SIZE,
+        default=list,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=RELATION_BATCH_MAX_SIZE,
+        default=list,
+    )
 
     def validate(self, attrs):
-        user = attrs.get("user")
-        recipe = attrs.get("recipe")
-        model = self.Meta.model
-        if model.objects.filter(user=user, recipe=recipe).exists():
+        if not attrs["add"] and not attrs["remove"]:
             raise serializers.ValidationError({
-                "detail": "Объект уже существует."
+                "detail": "Передайте рецепты в add или remove."
             })
-        return attrs
-
-    def to_representation(self, instance):
-        return RecipeMinifiedSerializer(
-            instance.recipe,
-            context=self.context,
-        ).data
-
-
-class FavoriteWriteSerializer(_BaseRelationWriteSerializer):
-    class Meta:
-        model = Favorite
-        fields = ("user", "recipe")
-
-
-class ShoppingCartWriteSerializer(_BaseRelationWriteSerializer):
-    class Meta:
-        model = ShoppingCart
-        fields = ("user", "recipe")
+        both = set(attrs["add"]) & set(attrs["remove"])
+        if both:
+            raise serializers.ValidationError({
+                "detail": "Рецепты одновременно в add и remove: {}.".format(
+                    ", ".join(map(str, sorted(both)))
+                )
+            })
+        # Повторы не меняют результат, порядок ответа — как в запросе.
+        return {key: list(dict.fromkeys(ids)) for key, ids in attrs.items()}
@@ -1,12 +1,26 @@
-from django.db.models import F, Prefetch, Sum
-from django.http import HttpResponse
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F, Prefetch
 from django.shortcuts import get_object_or_404, redirect
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.pagination import RecipeFeedPagination
+from api.utils.cache import CachedListMixin
+from api.utils.relations import add_relations, remove_relations
+from api.utils.shopping_list_export import (
+    EXPORT_FORMATS,
+    shopping_list_response,
+)
+from config.constants import INGREDIENTS_AUTOCOMPLETE_LIMIT
+from recipes import shopping_list
+from recipes.counters import change_favorites_counts
+from recipes.ingredient_index import ingredient_index
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -15,26 +29,30 @@ from recipes.models import (
     ShoppingCart,
     Tag,
 )
+from recipes.reference_cache import INGREDIENTS, TAGS
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (
     IngredientSerializer,
     RecipeListSerializer,
+    RecipeMinifiedSerializer,
     RecipeWriteSerializer,
+    RelationBatchSerializer,
+    SimilarRecipeSerializer,
     TagSerializer,
-    FavoriteWriteSerializer,
-    ShoppingCartWriteSerializer,
 )
-from .filters import IngredientFilter, RecipeFilter
+from .filters import IngredientFilter, RecipeFilter, RecipeSearchFilter
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespace = TAGS
     queryset = Tag.objects.all().order_by("name")
     serializer_class = TagSerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespace = INGREDIENTS
     queryset = Ingredient.objects.all().order_by("name")
     serializer_class = IngredientSerializer
     permission_classes = [permissions.AllowAny]
@@ -42,18 +60,31 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_class = IngredientFilter
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get("name")
+        if name is None:
+            return super().list(request, *args, **kwargs)
+        return Response(
+            ingredient_index.search(name, INGREDIENTS_AUTOCOMPLETE_LIMIT)
+        )
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrReadOnly
     ]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, RecipeSearchFilter]
     filterset_class = RecipeFilter
+    pagination_class = RecipeFeedPagination
+    lookup_value_regex = r"\d+"
 
     def get_queryset(self):
         return (
-            Recipe.objects.select_related("author")
+            Recipe.objects.with_user_flags(self.request.user)
+            # Вектор нужен только условию поиска, в ответ он не попадает.
+            .defer("search_vector")
+            .select_related("author")
             .prefetch_related(
                 "tags",
                 Prefetch(
@@ -91,57 +122,161 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     @action(
         detail=True,
-        methods=["post"],
-        permission_classes=[permissions.IsAuthenticated],
+        methods=["get"],
+        permission_classes=[permissions.AllowAny],
     )
-    def favorite(self, request, pk=None):
-        recipe = self.get_object()
-        serializer = FavoriteWriteSerializer(
-            data={"recipe": recipe.pk}, context={"request": request}
+    def similar(self, request, pk=None):
+        # Соседи предрассчитаны командой refresh_similar_recipes, ответ —
+        # одно чтение по индексу (recipe, -score) без вычислений.
+        recipes = list(
+            Recipe.objects.filter(similar_to__recipe_id=pk)
+            .annotate(score=F("similar_to__score"))
+            .only(
+                "id", "name", "image", "image_variants_ready", "cooking_time"
+            )
+            .order_by("-score", "id")
+        )
+        if not recipes and not Recipe.objects.filter(pk=pk).exists():
+            raise NotFound()
+        serializer = SimilarRecipeSerializer(
+            recipes, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
+    def _add_relation(self, model, request, pk):
+        if not add_relations(model, "recipe", [pk], user=request.user):
+            get_object_or_404(Recipe.objects.only("pk"), pk=pk)
+            return Response(
+                {"detail": "Объект уже существует."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        recipe = Recipe.objects.only(
+            "id", "name", "image", "image_variants_ready", "cooking_time"
+        ).get(pk=pk)
+        serializer = RecipeMinifiedSerializer(
+            recipe, context={"request": request}
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    @favorite.mapping.delete
-    def unfavorite(self, request, pk=None):
-        recipe = self.get_object()
-        deleted, _ = Favorite.objects.filter(
-            user=request.user, recipe=recipe
+    def _remove_relation(self, model, request, pk, message):
+        deleted, _ = model.objects.filter(
+            user=request.user, recipe_id=pk
         ).delete()
         if not deleted:
+            get_object_or_404(Recipe.objects.only("pk"), pk=pk)
             return Response(
-                {"detail": "Рецепта нет в избранном."},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"detail": message}, status=status.HTTP_400_BAD_REQUEST
             )
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def _batch_relations(self, model, request, apply_changes):
+        """Добавляет и удаляет связи пачкой без сигналов по каждой строке.
+
+        Счетчики и список покупок пересчитывает apply_changes(added,
+        removed) сразу для всех затронутых рецептов.
+        """
+        serializer = RelationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add_ids = serializer.validated_data["add"]
+        remove_ids = serializer.validated_data["remove"]
+        with transaction.atomic():
+            added = {
+                relation.recipe_id
+                for relation in add_relations(
+                    model,
+                    "recipe",
+                    add_ids,
+                    send_signals=False,
+                    user=request.user,
+                )
+            }
+            removed_ids = set(
+                remove_relations(
+                    model, "recipe", remove_ids, user=request.user
+                )
+            )
+            apply_changes(added, removed_ids)
+        # Несозданные и неудаленные id — либо уже в нужном состоянии,
+        # либо рецепта нет; различаем одним запросом.
+        rest = [pk for pk in add_ids if pk not in added] + [
+            pk for pk in remove_ids if pk not in removed_ids
+        ]
+        existing = set(
+            Recipe.objects.filter(pk__in=rest).values_list("pk", flat=True)
+            if rest
+            else ()
+        )
+
+        def outcome(pk, done, done_status, noop_status):
+            if pk in done:
+                return {"id": pk, "status": done_status}
+            if pk in existing:
+                return {"id": pk, "status": noop_status}
+            return {"id": pk, "status": "not_found"}
+
+        return Response(
+            {
+                "add": [
+                    outcome(pk, added, "created", "exists") for pk in add_ids
+                ],
+                "remove": [
+                    outcome(pk, removed_ids, "deleted", "absent")
+                    for pk in remove_ids
+                ],
+            }
+        )
+
     @action(
         detail=True,
         methods=["post"],
         permission_classes=[permissions.IsAuthenticated],
     )
-    def shopping_cart(self, request, pk=None):
-        recipe = self.get_object()
-        serializer = ShoppingCartWriteSerializer(
-            data={"recipe": recipe.pk}, context={"request": request}
+    def favorite(self, request, pk=None):
+        return self._add_relation(Favorite, request, pk)
+
+    @favorite.mapping.delete
+    def unfavorite(self, request, pk=None):
+        return self._remove_relation(
+            Favorite, request, pk, "Рецепта нет в избранном."
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def shopping_cart(self, request, pk=None):
+        return self._add_relation(ShoppingCart, request, pk)
 
     @shopping_cart.mapping.delete
     def remove_shopping_cart(self, request, pk=None):
-        recipe = self.get_object()
-        deleted, _ = ShoppingCart.objects.filter(
-            user=request.user, recipe=recipe
-        ).delete()
-        if not deleted:
-            return Response(
-                {"detail": "Рецепта нет в списке покупок."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return self._remove_relation(
+            ShoppingCart, request, pk, "Рецепта нет в списке покупок."
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="favorite/batch",
+    )
+    def favorite_batch(self, request):
+        return self._batch_relations(
+            Favorite, request, change_favorites_counts
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="shopping_cart/batch",
+    )
+    def shopping_cart_batch(self, request):
+        return self._batch_relations(
+            ShoppingCart,
+            request,
+            partial(shopping_list.change_cart, request.user.pk),
+        )
 
     @action(
         detail=False,
@@ -149,26 +284,19 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def download_shopping_cart(self, request):
-        qs = (
-            IngredientAmount.objects.filter(
-                recipe__in_carts__user=request.user
-            )
-            .values(
-                name=F("ingredient__name"),
-                unit=F("ingredient__measurement_unit"),
+        export_format = request.query_params.get("type", "txt")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {
+                    "type": [
+                        "Допустимые форматы: "
+                        + ", ".join(EXPORT_FORMATS)
+                        + "."
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            .annotate(total=Sum("amount"))
-            .order_by("name")
-        )
-        lines = [
-            f"{row['name']} ({row['unit']}) - {row['total']}" for row in qs
-        ]
-        content = "Список покупок:\n" + "\n".join(lines) + "\n"
-        resp = HttpResponse(content, content_type="text/plain; charset=utf-8")
-        resp["Content-Disposition"] = (
-            "attachment; filename=\"shopping_list.txt\""
-        )
-        return resp
+        return shopping_list_response(request.user, export_format)
 
 
 class ShortLinkRedirectView(APIView):
@@ -1,10 +1,10 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from api.utils.images import decode_data_uri_image
+from api.utils.images import decode_data_uri_image, image_variant_urls
+from api.utils.subscriptions import get_subscribed_author_ids
 from api.recipes.serializers import RecipeMinifiedSerializer
 from recipes.models import Recipe
-from users.models import Subscription
 
 User = get_user_model()
 
@@ -18,9 +18,18 @@ AVATAR_ALLOWED_MIME = {
 }
 
 
+def get_recipes_limit(request):
+    """Возвращает recipes_limit из запроса или None, если он не задан."""
+    limit = request.query_params.get("recipes_limit") if request else None
+    if limit and limit.isdigit():
+        return int(limit)
+    return None
+
+
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
     avatar = serializers.SerializerMethodField(read_only=True)
+    avatar_variants = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = User
@@ -32,17 +41,13 @@ class UserSerializer(serializers.ModelSerializer):
             "last_name",
             "is_subscribed",
             "avatar",
+            "avatar_variants",
         )
 
     def get_is_subscribed(self, obj):
         request = self.context.get("request")
         return bool(
-            request
-            and getattr(request, "user", None)
-            and request.user.is_authenticated
-            and Subscription.objects.filter(
-                user=request.user, author=obj
-            ).exists()
+            request and obj.pk in get_subscribed_author_ids(request)
         )
 
     def get_avatar(self, obj):
@@ -52,29 +57,30 @@ class UserSerializer(serializers.ModelSerializer):
         url = obj.avatar.url
         return request.build_absolute_uri(url) if request else url
 
+    def get_avatar_variants(self, obj):
+        return image_variant_urls(
+            obj.avatar, obj.avatar_variants_ready, self.context.get("request")
+        )
+
 
 class UserWithRecipesSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + ("recipes", "recipes_count")
 
     def get_recipes(self, obj):
-        request = self.context.get("request")
-        qs = Recipe.objects.filter(author=obj).order_by("-id")
-        limit = request.query_params.get("recipes_limit") if request else None
-        if limit and limit.isdigit():
-            n = int(limit)
-            if n >= 0:
-                qs = qs[: n]
+        qs = getattr(obj, "limited_recipes", None)
+        if qs is None:
+            qs = Recipe.objects.filter(author=obj).order_by("-id")
+            limit = get_recipes_limit(self.context.get("request"))
+            if limit is not None:
+                qs = qs[: limit]
         return RecipeMinifiedSerializer(
             qs, many=True, context=self.context
         ).data
 
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
-
 
 class SetAvatarSerializer(serializers.Serializer):
     avatar = serializers.CharField(write_only=True)
@@ -103,32 +109,3 @@ class SetAvatarSerializer(serializers.Serializer):
                 request.build_absolute_uri(url) if request and url else url
             )
         }
-
-
-class SubscriptionWriteSerializer(serializers.ModelSerializer):
-    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    author = serializers.PrimaryKeyRelatedField(
-        queryset=get_user_model().objects.all()
-    )
-
-    class Meta:
-        model = Subscription
-        fields = ("user", "author")
-
-    def validate(self, attrs):
-        user = attrs.get("user")
-        author = attrs.get("author")
-        if user == author:
-            raise serializers.ValidationError(
-                {"detail": "Нельзя подписаться на себя."}
-            )
-        if Subscription.objects.filter(user=user, author=author).exists():
-            raise serializers.ValidationError(
-                {"detail": "Подписка уже существует."}
-            )
-        return attrs
-
-    def to_representation(self, instance):
-        return UserWithRecipesSerializer(
-            instance.author, context=self.context
-        ).data
@@ -1,3 +1,5 @@
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import status
@@ -5,15 +7,20 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api.pagination import SubscriptionsPagination
+from api.utils.relations import add_relations
+from recipes.models import Recipe
 from users.models import Subscription, User
 from .serializers import (
     SetAvatarSerializer,
-    SubscriptionWriteSerializer,
     UserWithRecipesSerializer,
+    get_recipes_limit,
 )
 
 
 class UserViewSet(DjoserUserViewSet):
+    lookup_value_regex = r"\d+"
+
     @action(
         detail=False,
         methods=["put"],
@@ -31,7 +38,10 @@ class UserViewSet(DjoserUserViewSet):
     @avatar.mapping.delete
     def remove_avatar(self, request):
         if request.user.avatar:
-            request.user.avatar.delete(save=True)
+            # Файл может быть общим с другими записями, его удалит
+            # сигнал, когда ссылок не останется.
+            request.user.avatar = None
+            request.user.save(update_fields=["avatar"])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -39,11 +49,28 @@ class UserViewSet(DjoserUserViewSet):
         methods=["get"],
         url_path="subscriptions",
         permission_classes=[IsAuthenticated],
+        pagination_class=SubscriptionsPagination,
     )
     def subscriptions(self, request):
-        qs = User.objects.filter(
-            subscribers__user=request.user
-        ).order_by("id")
+        recipes = Recipe.objects.order_by("-id")
+        limit = get_recipes_limit(request)
+        if limit is not None:
+            recipes = recipes.annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F("author_id"),
+                    order_by=F("id").desc(),
+                )
+            ).filter(row_number__lte=limit)
+        qs = (
+            User.objects.filter(subscribers__user=request.user)
+            .prefetch_related(
+                Prefetch(
+                    "recipes", queryset=recipes, to_attr="limited_recipes"
+                )
+            )
+            .order_by("id")
+        )
         page = self.paginate_queryset(qs)
         serializer = UserWithRecipesSerializer(
             page, many=True, context={"request": request}
@@ -57,22 +84,29 @@ class UserViewSet(DjoserUserViewSet):
         permission_classes=[IsAuthenticated],
     )
     def subscribe(self, request, id=None):
-        author = get_object_or_404(User, pk=id)
-        serializer = SubscriptionWriteSerializer(
-            data={"author": author.id},
-            context={"request": request},
+        if request.user.pk == int(id):
+            return Response(
+                {"detail": "Нельзя подписаться на себя."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not add_relations(Subscription, "author", [id], user=request.user):
+            get_object_or_404(User.objects.only("pk"), pk=id)
+            return Response(
+                {"detail": "Подписка уже существует."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = UserWithRecipesSerializer(
+            User.objects.get(pk=id), context={"request": request}
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @subscribe.mapping.delete
     def unsubscribe(self, request, id=None):
-        author = get_object_or_404(User, pk=id)
         deleted, _ = Subscription.objects.filter(
-            user=request.user, author=author
+            user=request.user, author_id=id
         ).delete()
         if not deleted:
+            get_object_or_404(User.objects.only("pk"), pk=id)
             return Response(
                 {"detail": "Подписки не существует."},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,40 @@
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from config.constants import REFERENCE_CACHE_TIMEOUT
+from recipes.reference_cache import versioned_key
+
+
+class CachedListMixin:
+    """Отдает список справочника из кеша готовыми байтами JSON.
+
+    Ключ кеша содержит версию справочника, которую сигналы моделей
+    увеличивают при каждом изменении, поэтому устаревшие ответы просто
+    перестают запрашиваться. Ответ снабжается ETag, и повторный запрос с
+    совпадающим If-None-Match получает 304 без тела.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        key = versioned_key(self.cache_namespace, "list")
+        entry = cache.get(key)
+        if entry is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            data = self.get_serializer(queryset, many=True).data
+            body = JSONRenderer().render(data)
+            entry = (body, quote_etag(hashlib.md5(body).hexdigest()))
+            cache.set(key, entry, REFERENCE_CACHE_TIMEOUT)
+        body, etag = entry
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,101 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField, объекты которого загружаются пачкой.
+
+    Сам по себе проверяет только тип ключа и возвращает его, а объекты
+    подставляет владелец поля одним запросом in_bulk на весь список:
+    BulkManyRelatedField при many=True или BulkRelatedListSerializer, если
+    поле объявлено в дочернем сериализаторе списка. Ошибки те же, что у
+    PrimaryKeyRelatedField.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+    def resolve(self, pks):
+        """Возвращает найденные объекты и сообщения об отсутствующих."""
+        objects = self.get_queryset().in_bulk(set(pks))
+        missing = {
+            pk: self.error_messages["does_not_exist"].format(pk_value=pk)
+            for pk in pks
+            if pk not in objects
+        }
+        return objects, missing
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    def to_internal_value(self, data):
+        pks = super().to_internal_value(data)
+        objects, missing = self.child_relation.resolve(pks)
+        if missing:
+            raise serializers.ValidationError(list(missing.values()))
+        return [objects[pk] for pk in pks]
+
+
+class BulkRelatedListSerializer(serializers.ListSerializer):
+    """Список, где BulkPrimaryKeyRelatedField элементов разрешаются разом.
+
+    Для каждого такого поля выполняется один запрос in_bulk по ключам из
+    всех элементов; отсутствующие объекты возвращаются ошибками в формате
+    ListSerializer — по словарю на элемент.
+    """
+
+    def run_child_validation(self, data):
+        validated = super().run_child_validation(data)
+        self._validated_items.append(validated)
+        return validated
+
+    def to_internal_value(self, data):
+        # Элементы с ошибками других полей тоже проверяются на отсутствующие
+        # объекты, чтобы вернуть все ошибки сразу, как ListSerializer.
+        self._validated_items = []
+        try:
+            items = super().to_internal_value(data)
+        except serializers.ValidationError as exc:
+            if not isinstance(exc.detail, list):
+                raise
+            errors = exc.detail
+        else:
+            errors = [{} for _ in items]
+        valid = [
+            (item, item_errors)
+            for item, item_errors in zip(
+                self._validated_items,
+                (item_errors for item_errors in errors if not item_errors),
+            )
+        ]
+        for field in self.child._writable_fields:
+            if not isinstance(field, BulkPrimaryKeyRelatedField):
+                continue
+            pks = [
+                item[field.source] for item, _ in valid if field.source in item
+            ]
+            objects, missing = field.resolve(pks)
+            for item, item_errors in valid:
+                pk = item.get(field.source)
+                if pk in missing:
+                    item_errors[field.field_name] = [missing[pk]]
+                elif pk is not None:
+                    item[field.source] = objects[pk]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return self._validated_items
@@ -1,27 +1,123 @@
 import base64
 import binascii
+import tempfile
 import uuid
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files import File
+from PIL import Image, ImageOps, UnidentifiedImageError
 from rest_framework import serializers
 
+from config.constants import IMAGE_MAX_PIXELS, IMAGE_SAVE_QUALITY
+from recipes.image_variants import variant_urls
+
+DATA_URI_MAX_HEADER_LENGTH = 100
+BASE64_CHUNK_SIZE = 64 * 1024
+
+PILLOW_FORMATS = {
+    "png": "PNG",
+    "jpg": "JPEG",
+    "gif": "GIF",
+    "webp": "WEBP",
+}
+
+
+def sanitize_image(source, ext: str):
+    """Проверяет изображение через Pillow и пересохраняет без метаданных.
+
+    source — файл с исходными байтами; результат записывается в новый
+    временный файл. Формат должен совпадать с заявленным MIME-типом.
+    EXIF-ориентация применяется к пикселям, после чего EXIF и прочие
+    метаданные отбрасываются.
+    """
+    try:
+        with Image.open(source) as image:
+            image.verify()
+        source.seek(0)
+        image = Image.open(source)
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        raise serializers.ValidationError(
+            {"image": ["Файл не является изображением."]}
+        )
+    if image.format != PILLOW_FORMATS[ext]:
+        raise serializers.ValidationError(
+            {"image": ["Содержимое файла не совпадает с MIME-типом."]}
+        )
+    if image.width * image.height > IMAGE_MAX_PIXELS:
+        raise serializers.ValidationError(
+            {"image": ["Слишком большое разрешение изображения."]}
+        )
+    options = {"quality": IMAGE_SAVE_QUALITY}
+    if getattr(image, "is_animated", False):
+        options["save_all"] = True
+    else:
+        image = ImageOps.exif_transpose(image)
+    target = tempfile.TemporaryFile()
+    image.save(target, PILLOW_FORMATS[ext], **options)
+    target.seek(0)
+    return target
+
+
+def _decode_base64_to_file(value: str, start: int, max_size: int):
+    """Декодирует value[start:] по частям во временный файл."""
+    if (len(value) - start) // 4 * 3 > max_size:
+        raise serializers.ValidationError(
+            {"image": [f"Размер изображения больше {max_size} байт."]}
+        )
+    target = tempfile.TemporaryFile()
+    try:
+        for offset in range(start, len(value), BASE64_CHUNK_SIZE):
+            target.write(
+                base64.b64decode(
+                    value[offset:offset + BASE64_CHUNK_SIZE], validate=True
+                )
+            )
+    except (binascii.Error, ValueError):
+        target.close()
+        raise serializers.ValidationError(
+            {"image": ["Ошибка декодирования base64."]}
+        )
+    target.seek(0)
+    return target
+
+
+def image_variant_urls(file, ready, request=None):
+    """Абсолютные URL вариантов изображения для сериализаторов."""
+    if not file:
+        return None
+    urls = variant_urls(file.name, ready)
+    if request is None:
+        return urls
+    return {
+        variant: request.build_absolute_uri(url)
+        for variant, url in urls.items()
+    }
+
 
 def decode_data_uri_image(
     value: str,
     prefix: str = "",
     allowed_mime: dict | None = None,
+    max_size: int | None = None,
 ):
+    """Декодирует data URI с изображением в файл для ImageField.
+
+    Строка не копируется целиком: заголовок ищется в первых
+    DATA_URI_MAX_HEADER_LENGTH символах, base64 декодируется частями во
+    временный файл, а слишком большой файл отклоняется по длине строки до
+    начала декодирования.
+    """
     if not isinstance(value, str) or not value.startswith("data:"):
         raise serializers.ValidationError(
             {"image": ["Неверный формат изображения: ожидается data URI."]}
         )
 
-    try:
-        header, b64data = value.split(",", 1)
-    except ValueError:
+    comma = value.find(",", 0, DATA_URI_MAX_HEADER_LENGTH)
+    if comma == -1:
         raise serializers.ValidationError(
             {"image": ["Некорректный data URI (заголовок)."]}
         )
+    header = value[:comma]
 
     if ";base64" not in header:
         raise serializers.ValidationError(
@@ -39,12 +135,8 @@ def decode_data_uri_image(
             {"image": ["Недопустимый MIME-тип изображения."]}
         )
 
-    try:
-        raw = base64.b64decode(b64data, validate=True)
-    except (binascii.Error, ValueError):
-        raise serializers.ValidationError(
-            {"image": ["Ошибка декодирования base64."]}
-        )
-
-    filename = f"{prefix}{uuid.uuid4().hex}.{ext}"
-    return ContentFile(raw, name=filename)
+    if max_size is None:
+        max_size = settings.IMAGE_MAX_UPLOAD_SIZE
+    with _decode_base64_to_file(value, comma + 1, max_size) as raw:
+        image = sanitize_image(raw, ext)
+    return File(image, name=f"{prefix}{uuid.uuid4().hex}.{ext}")
@@ -0,0 +1,277 @@
+import re
+import struct
+import zlib
+from functools import lru_cache
+from pathlib import Path
+
+PAGE_SIZE = (595, 842)  # A4 в пунктах.
+TRUETYPE_VERSIONS = (b"\x00\x01\x00\x00", b"true")
+TO_UNICODE_BLOCK = 100
+
+
+class TrueTypeFont:
+    """Шрифт TrueType с метриками, нужными для встраивания в PDF."""
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        try:
+            self._parse(data)
+        except (KeyError, IndexError, struct.error) as error:
+            raise ValueError(f"Некорректный шрифт TrueType: {path}") from error
+        self.name = re.sub(r"[^A-Za-z0-9-]", "", Path(path).stem) or "Font"
+        self.length = len(data)
+        self.file = zlib.compress(data)
+
+    def _parse(self, data):
+        if data[:4] not in TRUETYPE_VERSIONS:
+            raise ValueError("Поддерживаются только шрифты с контурами glyf")
+        (count,) = struct.unpack_from(">H", data, 4)
+        tables = {}
+        for index in range(count):
+            tag, _, offset, _ = struct.unpack_from(
+                ">4sIII", data, 12 + 16 * index
+            )
+            tables[tag] = offset
+        head = tables[b"head"]
+        (self.units_per_em,) = struct.unpack_from(">H", data, head + 18)
+        self.bbox = struct.unpack_from(">4h", data, head + 36)
+        hhea = tables[b"hhea"]
+        self.ascent, self.descent = struct.unpack_from(">hh", data, hhea + 4)
+        (metrics,) = struct.unpack_from(">H", data, hhea + 34)
+        self.advances = [
+            struct.unpack_from(">H", data, tables[b"hmtx"] + 4 * index)[0]
+            for index in range(metrics)
+        ]
+        self.glyph_ids = _read_cmap(data, tables[b"cmap"])
+
+    def scale(self, value):
+        return round(value * 1000 / self.units_per_em)
+
+    def width(self, glyph_id):
+        """Ширина глифа в тысячных долях кегля."""
+        return self.scale(self.advances[min(glyph_id, len(self.advances) - 1)])
+
+
+def _read_cmap(data, cmap):
+    (count,) = struct.unpack_from(">H", data, cmap + 2)
+    subtables = {}
+    for index in range(count):
+        platform, encoding, offset = struct.unpack_from(
+            ">HHI", data, cmap + 4 + 8 * index
+        )
+        subtables[(platform, encoding)] = cmap + offset
+    for key in ((3, 10), (0, 4), (3, 1), (0, 3)):
+        if key in subtables:
+            offset = subtables[key]
+            (subtable_format,) = struct.unpack_from(">H", data, offset)
+            if subtable_format == 12:
+                return _read_cmap_format_12(data, offset)
+            if subtable_format == 4:
+                return _read_cmap_format_4(data, offset)
+    raise ValueError("В шрифте нет таблицы символов Unicode")
+
+
+def _read_cmap_format_4(data, offset):
+    (segments,) = struct.unpack_from(">H", data, offset + 6)
+    segments //= 2
+    ends = offset + 14
+    starts = ends + 2 * segments + 2
+    deltas = starts + 2 * segments
+    range_offsets = deltas + 2 * segments
+    glyph_ids = {}
+    for index in range(segments):
+        (end,) = struct.unpack_from(">H", data, ends + 2 * index)
+        (start,) = struct.unpack_from(">H", data, starts + 2 * index)
+        (delta,) = struct.unpack_from(">h", data, deltas + 2 * index)
+        position = range_offsets + 2 * index
+        (range_offset,) = struct.unpack_from(">H", data, position)
+        for code in range(start, min(end, 0xFFFE) + 1):
+            if range_offset:
+                (glyph_id,) = struct.unpack_from(
+                    ">H", data, position + range_offset + 2 * (code - start)
+                )
+                if glyph_id:
+                    glyph_id = (glyph_id + delta) & 0xFFFF
+            else:
+                glyph_id = (code + delta) & 0xFFFF
+            if glyph_id:
+                glyph_ids[code] = glyph_id
+    return glyph_ids
+
+
+def _read_cmap_format_12(data, offset):
+    (groups,) = struct.unpack_from(">I", data, offset + 12)
+    glyph_ids = {}
+    for index in range(groups):
+        start, end, first = struct.unpack_from(
+            ">III", data, offset + 16 + 12 * index
+        )
+        for code in range(start, end + 1):
+            glyph_ids[code] = first + code - start
+    return glyph_ids
+
+
+@lru_cache(maxsize=4)
+def load_font(path):
+    """Разбирает и сжимает шрифт один раз на процесс."""
+    return TrueTypeFont(path)
+
+
+def _stream(content):
+    data = zlib.compress(content)
+    return (
+        f"<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n"
+    ).encode() + data + b"\nendstream"
+
+
+class _Objects:
+    """Нумерует объекты PDF и запоминает их смещения для таблицы xref."""
+
+    def __init__(self):
+        self.offsets = {}
+        self.position = 0
+
+    def raw(self, data):
+        self.position += len(data)
+        return data
+
+    def add(self, number, body):
+        if isinstance(body, str):
+            body = body.encode()
+        self.offsets[number] = self.position
+        return self.raw(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+    def xref(self, root):
+        start = self.position
+        size = max(self.offsets) + 1
+        entries = "".join(
+            f"{self.offsets.get(number, 0):010d} 00000 n \n"
+            for number in range(1, size)
+        )
+        return (
+            f"xref\n0 {size}\n0000000000 65535 f \n{entries}"
+            f"trailer\n<< /Size {size} /Root {root} 0 R >>\n"
+            f"startxref\n{start}\n%%EOF\n"
+        ).encode()
+
+
+CATALOG, PAGES, FONT, CID_FONT, DESCRIPTOR, FONT_FILE, TO_UNICODE = range(
+    1, 8
+)
+FIRST_PAGE = 8
+
+
+def text_pdf(lines, font, font_size, line_height, margin):
+    """Отдает по частям PDF со строками lines, набранными шрифтом font.
+
+    Страницы пишутся сразу, как только набраны, поэтому в памяти держится
+    одна страница. Шрифт встраивается целиком (CIDFontType2, Identity-H),
+    текст остается текстом: его можно выделять и искать.
+    """
+    objects = _Objects()
+    yield objects.raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n") + objects.add(
+        CATALOG, f"<< /Type /Catalog /Pages {PAGES} 0 R >>"
+    )
+    width, height = PAGE_SIZE
+    per_page = (height - 2 * margin) // line_height
+    used = {}
+    pages = []
+    page = []
+
+    def flush():
+        number = FIRST_PAGE + 2 * len(pages)
+        content = (
+            f"BT /F1 {font_size} Tf {line_height} TL "
+            f"{margin} {height - margin - font_size} Td\n"
+        ).encode() + b"".join(page) + b"ET"
+        pages.append(number)
+        page.clear()
+        return objects.add(number + 1, _stream(content)) + objects.add(
+            number,
+            f"<< /Type /Page /Parent {PAGES} 0 R "
+            f"/MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 {FONT} 0 R >> >> "
+            f"/Contents {number + 1} 0 R >>",
+        )
+
+    for line in lines:
+        glyphs = []
+        for char in line:
+            glyph_id = font.glyph_ids.get(ord(char), 0)
+            used.setdefault(glyph_id, char)
+            glyphs.append(f"{glyph_id:04X}")
+        page.append(f"<{''.join(glyphs)}> Tj T*\n".encode())
+        if len(page) == per_page:
+            yield flush()
+    if page or not pages:
+        yield flush()
+    yield _font_objects(objects, font, used)
+    yield objects.add(
+        PAGES,
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{number} 0 R" for number in pages), len(pages)
+        ),
+    ) + objects.xref(CATALOG)
+
+
+def _font_objects(objects, font, used):
+    widths = " ".join(
+        f"{glyph_id} [{font.width(glyph_id)}]" for glyph_id in sorted(used)
+    )
+    bbox = " ".join(str(font.scale(value)) for value in font.bbox)
+    chars = sorted(
+        (glyph_id, char) for glyph_id, char in used.items() if glyph_id
+    )
+    blocks = []
+    for start in range(0, len(chars), TO_UNICODE_BLOCK):
+        block = chars[start:start + TO_UNICODE_BLOCK]
+        blocks.append(f"{len(block)} beginbfchar\n")
+        blocks.extend(
+            "<{:04X}> <{}>\n".format(
+                glyph_id, char.encode("utf-16-be").hex().upper()
+            )
+            for glyph_id, char in block
+        )
+        blocks.append("endbfchar\n")
+    cmap = (
+        "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) "
+        "/Supplement 0 >> def\n/CMapName /Adobe-Identity-UCS def\n"
+        "/CMapType 2 def\n1 begincodespacerange\n<0000> <FFFF>\n"
+        "endcodespacerange\n" + "".join(blocks) + "endcmap\n"
+        "CMapName currentdict /CMap defineresource pop\nend\nend"
+    )
+    return b"".join((
+        objects.add(
+            FONT,
+            f"<< /Type /Font /Subtype /Type0 /BaseFont /{font.name} "
+            f"/Encoding /Identity-H /DescendantFonts [{CID_FONT} 0 R] "
+            f"/ToUnicode {TO_UNICODE} 0 R >>",
+        ),
+        objects.add(
+            CID_FONT,
+            f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{font.name} "
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) "
+            "/Supplement 0 >> "
+            f"/FontDescriptor {DESCRIPTOR} 0 R /CIDToGIDMap /Identity "
+            f"/W [{widths}] >>",
+        ),
+        objects.add(
+            DESCRIPTOR,
+            f"<< /Type /FontDescriptor /FontName /{font.name} /Flags 32 "
+            f"/FontBBox [{bbox}] /ItalicAngle 0 "
+            f"/Ascent {font.scale(font.ascent)} "
+            f"/Descent {font.scale(font.descent)} "
+            f"/CapHeight {font.scale(font.ascent)} /StemV 80 "
+            f"/FontFile2 {FONT_FILE} 0 R >>",
+        ),
+        objects.add(
+            FONT_FILE,
+            (
+                f"<< /Length {len(font.file)} /Filter /FlateDecode "
+                f"/Length1 {font.length} >>\nstream\n"
+            ).encode() + font.file + b"\nendstream",
+        ),
+        objects.add(TO_UNICODE, _stream(cmap.encode())),
+    ))
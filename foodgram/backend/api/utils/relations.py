@@ -0,0 +1,121 @@
+from django.db import connections, router
+from django.db.models.signals import post_save
+
+
+def add_relations(
+    model, target_field, target_ids, send_signals=True, **values
+):
+    """Создает связи model с объектами target_ids, которых еще нет.
+
+    Выполняется одним запросом INSERT ... SELECT ... ON CONFLICT DO NOTHING
+    RETURNING (PostgreSQL и SQLite 3.35+): несуществующие объекты и уже
+    существующие связи пропускаются без IntegrityError, поэтому повторы
+    и параллельные двойные клики безопасны. Для вставленных строк вручную
+    отправляется post_save, чтобы сработали обработчики счетчиков и списка
+    покупок; с send_signals=False вызывающий код учитывает их сам, одной
+    пачкой. Возвращает созданные экземпляры.
+    """
+    if not target_ids:
+        return []
+    db = router.db_for_write(model)
+    connection = connections[db]
+    quote = connection.ops.quote_name
+    opts = model._meta
+    target = opts.get_field(target_field)
+    target_pk = target.target_field
+    template = model(**values)
+    columns, selected, params = [], [], []
+    for field in opts.concrete_fields:
+        if field.primary_key or field is target:
+            continue
+        value = field.pre_save(template, add=True)
+        columns.append(quote(field.column))
+        selected.append("%s")
+        params.append(field.get_db_prep_save(value, connection))
+    columns.append(quote(target.column))
+    selected.append(quote(target_pk.column))
+    params.extend(
+        target_pk.get_db_prep_value(pk, connection) for pk in target_ids
+    )
+    sql = (
+        "INSERT INTO {table} ({columns}) "
+        "SELECT {selected} FROM {target_table} "
+        "WHERE {target_pk} IN ({placeholders}) "
+        "ON CONFLICT DO NOTHING "
+        "RETURNING {pk}, {target_column}"
+    ).format(
+        table=quote(opts.db_table),
+        columns=", ".join(columns),
+        selected=", ".join(selected),
+        target_table=quote(target.related_model._meta.db_table),
+        target_pk=quote(target_pk.column),
+        placeholders=", ".join(["%s"] * len(target_ids)),
+        pk=quote(opts.pk.column),
+        target_column=quote(target.column),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    created = []
+    for pk, target_id in rows:
+        instance = model(
+            **{
+                field.attname: getattr(template, field.attname)
+                for field in opts.concrete_fields
+            }
+        )
+        instance.pk = pk
+        setattr(instance, target.attname, target_id)
+        instance._state.adding = False
+        instance._state.db = db
+        if send_signals:
+            post_save.send(
+                sender=model,
+                instance=instance,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=db,
+            )
+        created.append(instance)
+    return created
+
+
+def remove_relations(model, target_field, target_ids, **values):
+    """Удаляет связи model с объектами target_ids без сигналов.
+
+    Выполняется одним запросом DELETE ... RETURNING, поэтому pre_delete и
+    post_delete не отправляются: обработчики счетчиков и списка покупок
+    вызывающий код заменяет пакетным пересчетом. Возвращает id объектов,
+    связи с которыми действительно удалены.
+    """
+    if not target_ids:
+        return []
+    db = router.db_for_write(model)
+    connection = connections[db]
+    quote = connection.ops.quote_name
+    opts = model._meta
+    target = opts.get_field(target_field)
+    template = model(**values)
+    conditions, params = [], []
+    for name in values:
+        field = opts.get_field(name)
+        conditions.append(f"{quote(field.column)} = %s")
+        value = getattr(template, field.attname)
+        params.append(field.get_db_prep_value(value, connection))
+    params.extend(
+        target.get_db_prep_value(pk, connection) for pk in target_ids
+    )
+    conditions.append(
+        "{} IN ({})".format(
+            quote(target.column), ", ".join(["%s"] * len(target_ids))
+        )
+    )
+    sql = "DELETE FROM {table} WHERE {conditions} RETURNING {column}".format(
+        table=quote(opts.db_table),
+        conditions=" AND ".join(conditions),
+        column=quote(target.column),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [target_id for target_id, in cursor.fetchall()]
@@ -0,0 +1,22 @@
+from users.models import Subscription
+
+
+def get_subscribed_author_ids(request) -> set:
+    """Возвращает id авторов, на которых подписан текущий пользователь.
+
+    Множество загружается одним запросом и кешируется на объекте запроса,
+    поэтому все сериализаторы пользователей в ответе используют его
+    повторно.
+    """
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        return set()
+    author_ids = getattr(request, "_subscribed_author_ids", None)
+    if author_ids is None:
+        author_ids = set(
+            Subscription.objects.filter(user=user).values_list(
+                "author_id", flat=True
+            )
+        )
+        request._subscribed_author_ids = author_ids
+    return author_ids
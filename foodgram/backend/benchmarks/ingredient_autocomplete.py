@@ -0,0 +1,68 @@
+"""Бенчмарк автодополнения ингредиентов: индекс в памяти против БД.
+
+Загружает data/ingredients.csv во временную БД и сравнивает запрос
+``name__istartswith`` с поиском по IngredientPrefixIndex. Запуск из
+каталога backend:
+
+    python -m benchmarks.ingredient_autocomplete
+"""
+import csv
+import timeit
+
+from benchmarks.common import BACKEND_DIR, setup_django, test_database
+
+PREFIXES = ("а", "мол", "сыр", "картофель", "я")
+NUMBER = 200
+
+
+def populate():
+    from recipes.models import Ingredient
+
+    path = BACKEND_DIR.parent / "data" / "ingredients.csv"
+    with path.open(encoding="utf-8") as csv_file:
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in csv.reader(csv_file)
+        )
+
+
+def main():
+    setup_django()
+    from config.constants import INGREDIENTS_AUTOCOMPLETE_LIMIT
+    from recipes.ingredient_index import ingredient_index
+    from recipes.models import Ingredient
+
+    with test_database():
+        populate()
+
+        def rebuild():
+            ingredient_index.invalidate()
+            ingredient_index.search("")
+
+        build = timeit.timeit(rebuild, number=5) / 5
+        print(f"{'index build':>24}: {build * 1000:9.2f} ms")
+        for prefix in PREFIXES:
+            db_time = timeit.timeit(
+                lambda: list(
+                    Ingredient.objects.filter(name__istartswith=prefix)
+                    .order_by("name")
+                    .values("id", "name", "measurement_unit")[
+                        :INGREDIENTS_AUTOCOMPLETE_LIMIT
+                    ]
+                ),
+                number=NUMBER,
+            ) / NUMBER
+            index_time = timeit.timeit(
+                lambda: ingredient_index.search(
+                    prefix, INGREDIENTS_AUTOCOMPLETE_LIMIT
+                ),
+                number=NUMBER,
+            ) / NUMBER
+            print(
+                f"{prefix!r:>24}: db {db_time * 1e6:9.1f} us, "
+                f"index {index_time * 1e6:7.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Бенчмарк подбора рецептов по продуктам: индекс в памяти против SQL.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.pantry_index
+"""
+import random
+
+from benchmarks.common import measure, report, setup_django, test_database
+
+RECIPES = 100_000
+INGREDIENTS = 2_000
+PANTRY_SIZES = (10, 30, 100)
+
+
+def populate():
+    from recipes.models import Ingredient, IngredientAmount, Recipe
+    from users.models import User
+
+    author = User.objects.create_user(
+        email="author@example.com",
+        username="author",
+        first_name="Author",
+        last_name="Author",
+    )
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f"ингредиент {number}", measurement_unit="г")
+        for number in range(INGREDIENTS)
+    )
+    ingredient_ids = list(Ingredient.objects.values_list("id", flat=True))
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author=author,
+                name=f"Рецепт {number}",
+                image="recipes/images/benchmark.png",
+                text="Текст",
+                cooking_time=10,
+            )
+            for number in range(RECIPES)
+        ),
+        batch_size=2000,
+    )
+    rng = random.Random(0)
+    # Популярные ингредиенты встречаются чаще, как соль и лук в жизни.
+    weights = [1 / (rank + 1) for rank in range(INGREDIENTS)]
+    IngredientAmount.objects.bulk_create(
+        (
+            IngredientAmount(
+                recipe_id=recipe_id, ingredient_id=ingredient_id, amount=1
+            )
+            for recipe_id in Recipe.objects.values_list("id", flat=True)
+            for ingredient_id in set(
+                rng.choices(ingredient_ids, weights, k=rng.randint(3, 10))
+            )
+        ),
+        batch_size=5000,
+    )
+    return ingredient_ids
+
+
+def sql_cookable(have, max_missing):
+    from django.db.models import Count, F, Q
+
+    from recipes.models import Recipe
+
+    return list(
+        Recipe.objects.annotate(
+            total=Count("ingredient_amounts"),
+            matched=Count(
+                "ingredient_amounts",
+                filter=Q(ingredient_amounts__ingredient_id__in=have),
+            ),
+        )
+        .filter(matched__gte=1)
+        .filter(matched__gte=F("total") - max_missing)
+        .values_list("id", flat=True)
+    )
+
+
+def main():
+    setup_django()
+    from recipes.pantry_index import pantry_index
+
+    with test_database():
+        ingredient_ids = populate()
+        pantry_index.invalidate()
+        seconds, queries = measure(
+            lambda: pantry_index.cookable(ingredient_ids[:1]), repeat=1
+        )
+        report("build index", seconds, queries)
+        for size in PANTRY_SIZES:
+            have = ingredient_ids[:size]
+            for max_missing in (0, 2):
+                title = f"{size} products, missing <= {max_missing}"
+                assert sorted(sql_cookable(have, max_missing)) == (
+                    pantry_index.cookable(have, max_missing)
+                )
+                seconds, queries = measure(
+                    lambda: pantry_index.cookable(have, max_missing)
+                )
+                report(f"index {title}", seconds, queries)
+                seconds, queries = measure(
+                    lambda: sql_cookable(have, max_missing)
+                )
+                report(f"SQL {title}", seconds, queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Бенчмарк глубоких страниц ленты рецептов: OFFSET против keyset.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.recipe_feed
+"""
+from benchmarks.common import measure, report, setup_django, test_database
+
+RECIPES = 50_000
+PAGE_SIZE = 6
+DEPTHS = (1, 100, 1000, 5000)
+
+
+def populate():
+    from recipes.models import Recipe
+    from users.models import User
+
+    author = User.objects.create_user(
+        email="author@example.com",
+        username="author",
+        first_name="Author",
+        last_name="Author",
+    )
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author=author,
+                name=f"Рецепт {number}",
+                image="recipes/images/benchmark.png",
+                text="Текст",
+                cooking_time=10,
+            )
+            for number in range(RECIPES)
+        ),
+        batch_size=2000,
+    )
+
+
+def cursor_for_page(client, page):
+    """Доходит до нужной страницы по ссылкам next и возвращает курсор."""
+    from urllib.parse import parse_qs, urlsplit
+
+    params = {"cursor": "", "limit": PAGE_SIZE * (page - 1)}
+    if page == 1:
+        return ""
+    next_link = client.get("/api/recipes/", params).data["next"]
+    return parse_qs(urlsplit(next_link).query)["cursor"][0]
+
+
+def main():
+    setup_django()
+    from rest_framework.test import APIClient
+
+    with test_database():
+        populate()
+        client = APIClient()
+        for page in DEPTHS:
+            seconds, queries = measure(
+                lambda: client.get(
+                    "/api/recipes/", {"page": page, "limit": PAGE_SIZE}
+                )
+            )
+            report(f"page={page}", seconds, queries)
+            cursor = cursor_for_page(client, page)
+            seconds, queries = measure(
+                lambda: client.get(
+                    "/api/recipes/", {"cursor": cursor, "limit": PAGE_SIZE}
+                )
+            )
+            report(f"cursor at page {page}", seconds, queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Бенчмарк полнотекстового поиска рецептов против icontains.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.recipe_search
+"""
+import random
+
+from benchmarks.common import measure, report, setup_django, test_database
+
+RECIPES = 100_000
+WORDS = (
+    "борщ суп салат пирог блины каша котлеты запеканка рагу плов "
+    "курица говядина свинина рыба грибы картофель капуста свекла морковь "
+    "лук чеснок томаты сыр сметана молоко мука яйца рис гречка фасоль "
+    "жарить варить тушить запекать нарезать смешать посолить подавать"
+).split()
+FILLER_WORDS = [f"слово{number}" for number in range(5000)]
+QUERIES = ("борщ", "курица рис", "запекать сыр грибы", "слово42", "трюфель")
+
+
+def populate():
+    from recipes.models import Recipe
+    from users.models import User
+
+    author = User.objects.create_user(
+        email="author@example.com",
+        username="author",
+        first_name="Author",
+        last_name="Author",
+    )
+    rng = random.Random(0)
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author=author,
+                name=" ".join(rng.choices(WORDS, k=3)).capitalize(),
+                image="recipes/images/benchmark.png",
+                text=" ".join(
+                    rng.choices(WORDS, k=5) + rng.choices(FILLER_WORDS, k=55)
+                ),
+                cooking_time=10,
+            )
+            for _ in range(RECIPES)
+        ),
+        batch_size=2000,
+    )
+
+
+def main():
+    setup_django()
+    from django.db.models import Q
+    from rest_framework.test import APIClient
+
+    from recipes.models import Recipe
+
+    with test_database():
+        populate()
+        client = APIClient()
+        for query in QUERIES:
+            seconds, queries = measure(
+                lambda: client.get("/api/recipes/", {"search": query})
+            )
+            report(f"search '{query}'", seconds, queries)
+            condition = Q()
+            for word in query.split():
+                condition &= Q(name__icontains=word) | Q(text__icontains=word)
+            seconds, queries = measure(
+                lambda: list(
+                    Recipe.objects.filter(condition).order_by("-id")[:6]
+                )
+                + [Recipe.objects.filter(condition).count()]
+            )
+            report(f"icontains '{query}'", seconds, queries)
+
+
+if __name__ == "__main__":
+    main()
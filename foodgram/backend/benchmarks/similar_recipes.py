@@ -0,0 +1,33 @@
+"""Бенчмарк пересчета и выдачи похожих рецептов.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.similar_recipes
+"""
+from benchmarks.common import measure, report, setup_django, test_database
+from benchmarks.pantry_index import populate
+
+
+def main():
+    setup_django()
+    from rest_framework.test import APIClient
+
+    from recipes.models import Recipe
+    from recipes.similarity import refresh_similar_recipes
+
+    with test_database():
+        populate()
+        seconds, queries = measure(refresh_similar_recipes, repeat=1)
+        report("refresh_similar_recipes", seconds, queries)
+        recipe_id = Recipe.objects.order_by("id").values_list(
+            "id", flat=True
+        )[500]
+        client = APIClient()
+        seconds, queries = measure(
+            lambda: client.get(f"/api/recipes/{recipe_id}/similar/")
+        )
+        report("GET /recipes/{id}/similar/", seconds, queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Бенчмарк страницы подписок: 100 подписок по 100 рецептов.
+
+Запуск из каталога backend:
+
+    python -m benchmarks.subscriptions
+"""
+from benchmarks.common import measure, report, setup_django, test_database
+
+AUTHORS = 100
+RECIPES_PER_AUTHOR = 100
+
+
+def populate():
+    from recipes.models import Recipe
+    from users.models import Subscription, User
+
+    reader = User.objects.create_user(
+        email="reader@example.com",
+        username="reader",
+        first_name="Reader",
+        last_name="Reader",
+    )
+    authors = User.objects.bulk_create(
+        User(
+            email=f"author{number}@example.com",
+            username=f"author{number}",
+            first_name="Author",
+            last_name=str(number),
+        )
+        for number in range(AUTHORS)
+    )
+    Subscription.objects.bulk_create(
+        Subscription(user=reader, author=author) for author in authors
+    )
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author=author,
+                name=f"Рецепт {number}",
+                image="recipes/images/benchmark.png",
+                text="Текст",
+                cooking_time=10,
+            )
+            for author in authors
+            for number in range(RECIPES_PER_AUTHOR)
+        ),
+        batch_size=1000,
+    )
+    return reader
+
+
+def main():
+    setup_django()
+    from rest_framework.test import APIClient
+
+    with test_database():
+        client = APIClient()
+        client.force_authenticate(populate())
+        for recipes_limit in (3, None):
+            params = {"limit": AUTHORS}
+            if recipes_limit is not None:
+                params["recipes_limit"] = recipes_limit
+            seconds, queries = measure(
+                lambda: client.get("/api/users/subscriptions/", params)
+            )
+            report(
+                f"subscriptions, recipes_limit={recipes_limit}",
+                seconds,
+                queries,
+            )
+
+
+if __name__ == "__main__":
+    main()
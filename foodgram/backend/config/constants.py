@@ -1,5 +1,13 @@
 DEFAULT_PAGE_SIZE = 6
+RELATION_BATCH_MAX_SIZE = 200
 INGREDIENTS_AUTOCOMPLETE_LIMIT = 50
+INGREDIENT_INDEX_TTL = 300
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+SHOPPING_LIST_CACHE_TIMEOUT = 60 * 60
+SHOPPING_LIST_EXPORT_CHUNK_SIZE = 2000
+SIMILAR_RECIPES_TOP_K = 10
+SIMILAR_RECIPES_TAG_WEIGHT = 0.5
+SIMILAR_RECIPES_MAX_POSTINGS = 500
 SHORTLINK_CODE_LENGTH = 6
 SHORTLINK_CODE_MAX_LENGTH = 16
 
@@ -14,3 +22,13 @@ COOKING_TIME_MAX = 32000
 
 INGREDIENT_AMOUNT_MIN = 1
 INGREDIENT_AMOUNT_MAX = 32000
+
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_SAVE_QUALITY = 90
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_WORKERS = 2
+MEDIA_GC_GRACE_PERIOD = 60 * 60
+IMAGE_VARIANTS = {
+    "thumbnail": {"size": (360, 240), "format": "JPEG", "crop": True},
+    "webp": {"size": (1200, 1200), "format": "WEBP", "crop": False},
+}
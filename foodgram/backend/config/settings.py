@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -135,6 +136,20 @@ else:
         }
     }
 
+# Версии кешей справочников и списков покупок меняют и сервер, и команды
+# manage.py (load_tags, import_csv), поэтому кеш должен быть общим для
+# процессов: LocMemCache по умолчанию у каждого процесса свой.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "foodgram_cache"),
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
 
 AUTH_USER_MODEL = "users.User"
 
@@ -216,6 +231,24 @@ USE_TZ = True
 MEDIA_URL = "/media/"
 _MEDIA_ROOT = os.getenv("MEDIA_ROOT")
 MEDIA_ROOT = Path(_MEDIA_ROOT) if _MEDIA_ROOT else (BASE_DIR / "media")
+STORAGES = {
+    "default": {"BACKEND": "config.storage.HashedFileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+IMAGE_MAX_UPLOAD_SIZE = int(
+    os.getenv("IMAGE_MAX_UPLOAD_SIZE", str(10 * 1024 * 1024))
+)
+# False — варианты изображений создаются в запросе, после коммита.
+IMAGE_VARIANTS_ASYNC = _to_bool(
+    os.getenv("IMAGE_VARIANTS_ASYNC"), default=True
+)
+# Шрифт TrueType с кириллицей для выгрузки PDF: путь или имя файла в
+# системных каталогах шрифтов (в образе — пакет fonts-dejavu-core).
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    "SHOPPING_LIST_PDF_FONT", "DejaVuSans.ttf"
+)
 
 
 STATIC_URL = "static/"
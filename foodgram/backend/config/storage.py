@@ -0,0 +1,54 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """Файловое хранилище с именами по SHA-256 содержимого.
+
+    Каталог и расширение берутся из запрошенного имени, а имя файла
+    заменяется хешом. Одинаковые байты попадают в один файл, и повторная
+    запись пропускается, но время изменения файла обновляется: по нему
+    сборщик мусора (recipes.media_files.find_orphans) не трогает файлы
+    незавершенных загрузок.
+    """
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, "seek") and content.seekable():
+            content.seek(0)
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        if hasattr(content, "seek") and content.seekable():
+            content.seek(0)
+        dirname, filename = posixpath.split(name)
+        ext = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(dirname, f"{digest.hexdigest()}{ext}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return super().save(name, content, max_length=max_length)
+        return name
+
+    def save_exact(self, name, content):
+        """Сохраняет файл под заданным именем без хеширования.
+
+        Нужен для производных файлов с вычисляемыми путями (варианты
+        изображений), имя которых уже однозначно определено хешем
+        оригинала.
+        """
+        if self.exists(name):
+            return name
+        return super().save(name, content)
@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Count
 
 from .models import (
     Favorite,
@@ -7,8 +6,11 @@ from .models import (
     IngredientAmount,
     Recipe,
     ShoppingCart,
+    ShoppingListItem,
     Tag,
 )
+from .pantry_index import pantry_index
+from .shopping_list import refresh_recipe
 
 
 class IngredientAmountInline(admin.TabularInline):
@@ -28,16 +30,24 @@ class RecipeAdmin(admin.ModelAdmin):
         "favorites_count",
     )
     list_filter = ("author", "tags")
+    list_select_related = ("author",)
     search_fields = ("name", "author__username", "author__email")
     inlines = (IngredientAmountInline,)
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(_fav_count=Count("in_favorites"))
-
-    @admin.display(description="В избранном")
-    def favorites_count(self, obj):
-        return getattr(obj, "_fav_count", None) or obj.in_favorites.count()
+    def save_related(self, request, form, formsets, change):
+        ingredient_ids = set(
+            form.instance.ingredient_amounts.values_list(
+                "ingredient_id", flat=True
+            )
+        )
+        super().save_related(request, form, formsets, change)
+        ingredient_ids.update(
+            form.instance.ingredient_amounts.values_list(
+                "ingredient_id", flat=True
+            )
+        )
+        refresh_recipe(form.instance.pk, ingredient_ids)
+        pantry_index.refresh_recipe(form.instance.pk)
 
 
 @admin.register(Tag)
@@ -52,3 +62,10 @@ class IngredientAdmin(admin.ModelAdmin):
 
 admin.site.register(Favorite)
 admin.site.register(ShoppingCart)
+
+
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = ("user", "ingredient", "amount")
+    list_select_related = ("user", "ingredient")
+    search_fields = ("user__email", "ingredient__name")
@@ -0,0 +1,104 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+from .models import Favorite, Recipe
+
+
+def change_counter(queryset, field, delta):
+    """Атомарно меняет счетчик на delta выражением F() в одном UPDATE."""
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def change_counters(queryset, field, deltas):
+    """Меняет счетчики нескольких объектов одним UPDATE.
+
+    deltas — {pk: delta}; как и в change_counter, счетчик не уходит ниже
+    нуля.
+    """
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(pk)
+    if not by_delta:
+        return
+    whens = [
+        When(
+            pk__in=pks,
+            **({f"{field}__gte": -delta} if delta < 0 else {}),
+            then=F(field) + delta,
+        )
+        for delta, pks in by_delta.items()
+    ]
+    queryset.filter(
+        pk__in=[pk for pks in by_delta.values() for pk in pks]
+    ).update(
+        **{
+            field: Case(
+                *whens,
+                default=F(field),
+                output_field=queryset.model._meta.get_field(field),
+            )
+        }
+    )
+
+
+def change_favorites_counts(added=(), removed=()):
+    """Учитывает пачку добавлений и удалений из избранного одним UPDATE."""
+    change_counters(
+        Recipe.objects.all(),
+        "favorites_count",
+        dict.fromkeys(added, 1) | dict.fromkeys(removed, -1),
+    )
+
+
+def _count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _reconcile(model, field, actual):
+    drifted = model.objects.annotate(actual=actual).exclude(
+        **{field: F("actual")}
+    )
+    return drifted.update(**{field: actual})
+
+
+def reconcile_counters():
+    """Пересчитывает счетчики по исходным таблицам.
+
+    Возвращает количество исправленных рецептов и пользователей.
+    """
+    return (
+        _reconcile(
+            Recipe,
+            "favorites_count",
+            _count_subquery(Favorite, "recipe"),
+        ),
+        _reconcile(
+            get_user_model(),
+            "recipes_count",
+            _count_subquery(Recipe, "author"),
+        ),
+    )
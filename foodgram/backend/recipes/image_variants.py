@@ -0,0 +1,173 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from config.constants import (
+    IMAGE_VARIANT_QUALITY,
+    IMAGE_VARIANT_WORKERS,
+    IMAGE_VARIANTS,
+)
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = "variants"
+
+_executor = ThreadPoolExecutor(
+    max_workers=IMAGE_VARIANT_WORKERS,
+    thread_name_prefix="image-variants",
+)
+
+
+def variant_name(name, variant):
+    """Путь к варианту изображения рядом с оригиналом."""
+    path = PurePosixPath(name)
+    ext = IMAGE_VARIANTS[variant]["format"].lower().replace("jpeg", "jpg")
+    return str(path.parent / VARIANTS_DIR / f"{path.stem}_{variant}.{ext}")
+
+
+def ready_field(field):
+    """Имя флага модели «варианты изображения из field готовы»."""
+    return f"{field}_variants_ready"
+
+
+def variant_urls(name, ready):
+    """URL вариантов; пока варианты не готовы, отдается URL оригинала.
+
+    Готовность берется из флага модели, а не из хранилища: сериализация
+    не обращается к файлам.
+    """
+    return {
+        variant: default_storage.url(
+            variant_name(name, variant) if ready else name
+        )
+        for variant in IMAGE_VARIANTS
+    }
+
+
+def _missing_variants(name):
+    missing = {}
+    for variant in IMAGE_VARIANTS:
+        target = variant_name(name, variant)
+        if not default_storage.exists(target):
+            missing[variant] = target
+    return missing
+
+
+def _render(image, spec):
+    if spec["crop"]:
+        image = ImageOps.fit(image, spec["size"])
+    else:
+        image = image.copy()
+        image.thumbnail(spec["size"])
+    if spec["format"] == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, spec["format"], quality=IMAGE_VARIANT_QUALITY)
+    return buffer.getvalue()
+
+
+def generate_variants(name):
+    """Создает недостающие варианты изображения name в хранилище."""
+    missing = _missing_variants(name)
+    if not missing:
+        return
+    # Хранилище с хешированными именами сохранило бы вариант под хешом
+    # его содержимого, а путь варианта должен оставаться вычисляемым.
+    save = getattr(default_storage, "save_exact", default_storage.save)
+    with default_storage.open(name, "rb") as source:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            for variant, target in missing.items():
+                content = ContentFile(_render(image, IMAGE_VARIANTS[variant]))
+                save(target, content)
+
+
+def _generate_logged(model, field, name):
+    """Создает варианты и ставит флаг готовности; ошибки пишет в лог."""
+    try:
+        generate_variants(name)
+        model._default_manager.filter(**{field: name}).update(
+            **{ready_field(field): True}
+        )
+    except Exception:
+        logger.exception("Не удалось создать варианты изображения %s", name)
+        return False
+    return True
+
+
+def _generate_in_pool(model, field, name):
+    # Потоки пула живут долго, а запросы, после которых Django закрывает
+    # соединения, через них не проходят: соединение, оборванное сервером
+    # или устаревшее по CONN_MAX_AGE, закрывается здесь.
+    close_old_connections()
+    try:
+        _generate_logged(model, field, name)
+    finally:
+        close_old_connections()
+
+
+def image_fields():
+    """Пары (модель, поле) изображений, для которых создаются варианты."""
+    return (
+        (apps.get_model("recipes", "Recipe"), "image"),
+        (get_user_model(), "avatar"),
+    )
+
+
+def generate_pending_variants():
+    """Создает варианты для всех файлов, у которых флаг готовности снят.
+
+    Задачи пула живут только в памяти процесса и теряются при его
+    перезапуске; эта функция досоздает такие варианты синхронно.
+    Возвращает (создано, с ошибкой).
+    """
+    done = failed = 0
+    for model, field in image_fields():
+        names = (
+            model._default_manager.filter(**{ready_field(field): False})
+            .exclude(**{field: ""})
+            .exclude(**{f"{field}__isnull": True})
+            .values_list(field, flat=True)
+            .distinct()
+        )
+        for name in names.iterator():
+            if _generate_logged(model, field, name):
+                done += 1
+            else:
+                failed += 1
+    return done, failed
+
+
+def schedule_variants(instance, field):
+    """Ставит генерацию вариантов в фоновый пул после коммита транзакции.
+
+    Вызывается после сохранения instance с новым файлом в field. Запрос не
+    ждет обработки изображения: флаг готовности сбрасывается, и до
+    окончания генерации variant_urls отдает ссылку на оригинал.
+    """
+    name = getattr(instance, field).name
+    ready = bool(name) and not _missing_variants(name)
+    flag = ready_field(field)
+    if getattr(instance, flag) != ready:
+        setattr(instance, flag, ready)
+        type(instance)._default_manager.filter(pk=instance.pk).update(
+            **{flag: ready}
+        )
+    if not name or ready:
+        return
+    model = type(instance)
+    if settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(
+            lambda: _executor.submit(_generate_in_pool, model, field, name)
+        )
+    else:
+        transaction.on_commit(lambda: _generate_logged(model, field, name))
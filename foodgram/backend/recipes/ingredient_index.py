@@ -0,0 +1,70 @@
+import threading
+import time
+from bisect import bisect_left
+
+from config.constants import INGREDIENT_INDEX_TTL
+from .models import Ingredient
+
+
+class IngredientPrefixIndex:
+    """Индекс ингредиентов в памяти процесса для автодополнения.
+
+    Хранит отсортированный массив названий, приведенных через casefold, и
+    отвечает на запрос префикса двоичным поиском: сначала точное
+    совпадение, затем остальные названия с этим префиксом по алфавиту.
+    Строится лениво при первом обращении, сбрасывается сигналами при
+    изменении ингредиентов в этом процессе и перестраивается не реже раза
+    в ``ttl`` секунд, чтобы подхватить изменения из других процессов
+    (import_csv, соседние воркеры).
+    """
+
+    def __init__(self, ttl=INGREDIENT_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._keys = None
+        self._rows = None
+        self._built_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+            self._rows = None
+
+    def _snapshot(self):
+        with self._lock:
+            expired = time.monotonic() - self._built_at > self.ttl
+            if self._keys is None or expired:
+                entries = sorted(
+                    (name.casefold(), name, pk, unit)
+                    for pk, name, unit in Ingredient.objects.values_list(
+                        "id", "name", "measurement_unit"
+                    )
+                )
+                self._keys = [entry[0] for entry in entries]
+                self._rows = [
+                    {"id": pk, "name": name, "measurement_unit": unit}
+                    for _, name, pk, unit in entries
+                ]
+                self._built_at = time.monotonic()
+            return self._keys, self._rows
+
+    def search(self, prefix, limit=None):
+        """Возвращает ингредиенты, название которых начинается с prefix.
+
+        Пустой префикс (в том числе из одних пробелов) ничего не находит.
+        """
+        key = prefix.strip().casefold()
+        if not key:
+            return []
+        keys, rows = self._snapshot()
+        results = []
+        for position in range(bisect_left(keys, key), len(keys)):
+            if not keys[position].startswith(key):
+                break
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(rows[position])
+        return results
+
+
+ingredient_index = IngredientPrefixIndex()
@@ -0,0 +1,39 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from config.constants import MEDIA_GC_GRACE_PERIOD
+from recipes.media_files import find_orphans
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаление файлов из MEDIA_ROOT, на которые не ссылается ни один "
+        "рецепт или пользователь (включая варианты изображений)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать файлы, которые будут удалены.",
+        )
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            default=MEDIA_GC_GRACE_PERIOD,
+            help=(
+                "Не трогать файлы моложе указанного числа секунд "
+                f"(по умолчанию {MEDIA_GC_GRACE_PERIOD})."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        orphans = find_orphans(grace_period=options["grace_period"])
+        for name in orphans:
+            self.stdout.write(name)
+            if not options["dry_run"]:
+                default_storage.delete(name)
+        action = "Found" if options["dry_run"] else "Removed"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} orphaned files: {len(orphans)}")
+        )
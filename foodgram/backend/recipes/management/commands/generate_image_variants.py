@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from recipes.image_variants import generate_pending_variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Создание вариантов изображений рецептов и аватаров, которые еще "
+        "не готовы (например, задачи фонового пула потерялись при "
+        "перезапуске)"
+    )
+
+    def handle(self, *args, **options):
+        done, failed = generate_pending_variants()
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f"Generated: {done}, failed: {failed}"))
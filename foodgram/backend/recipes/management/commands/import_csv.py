@@ -9,6 +9,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from recipes.models import Ingredient
+from recipes.reference_cache import INGREDIENTS, bump_version
 
 LOG_FILE = Path(__file__).resolve().parent / "import_csv.log"
 
@@ -155,6 +156,8 @@ class Command(BaseCommand):
                     batch_size=1000,
                 )
             created = len(to_insert)
+            # bulk_create не отправляет post_save, сбрасываем кеш вручную.
+            bump_version(INGREDIENTS)
         updated = 0
         skipped = total - created
         return created, updated, skipped
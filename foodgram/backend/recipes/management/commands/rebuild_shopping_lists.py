@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.shopping_list import find_mismatches, rebuild_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчет материализованных списков покупок (ShoppingListItem) "
+        "по корзинам и составу рецептов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help=(
+                "Только сравнить с расчетом по исходным таблицам и "
+                "завершиться с ошибкой при расхождениях."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            mismatches = find_mismatches()
+            for (user_id, ingredient_id), (stored, expected) in sorted(
+                mismatches.items()
+            ):
+                self.stdout.write(
+                    f"user={user_id} ingredient={ingredient_id}: "
+                    f"stored={stored}, expected={expected}"
+                )
+            if mismatches:
+                raise CommandError(f"Mismatches: {len(mismatches)}")
+            self.stdout.write(self.style.SUCCESS("Shopping lists are in sync"))
+            return
+        rebuild_all()
+        self.stdout.write(self.style.SUCCESS("Shopping lists rebuilt"))
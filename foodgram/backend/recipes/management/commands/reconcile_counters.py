@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверка денормализованных счетчиков (Recipe.favorites_count, "
+        "User.recipes_count) с исходными таблицами и исправление расхождений"
+    )
+
+    def handle(self, *args, **options):
+        recipes_fixed, users_fixed = reconcile_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fixed recipes: {recipes_fixed}, users: {users_fixed}"
+            )
+        )
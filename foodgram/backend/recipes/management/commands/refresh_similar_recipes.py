@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.constants import SIMILAR_RECIPES_TOP_K
+from recipes.similarity import refresh_similar_recipes
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчет таблицы похожих рецептов (SimilarRecipe) по составу "
+        "и тегам"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=SIMILAR_RECIPES_TOP_K,
+            help="Сколько похожих рецептов хранить для каждого рецепта.",
+        )
+
+    def handle(self, *args, **options):
+        if options["top_k"] < 1:
+            raise CommandError("--top-k must be positive")
+        saved = refresh_similar_recipes(options["top_k"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Similar recipes saved: {saved}")
+        )
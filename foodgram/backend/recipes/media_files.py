@@ -0,0 +1,98 @@
+import os
+import time
+from pathlib import PurePosixPath
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+
+from config.constants import MEDIA_GC_GRACE_PERIOD
+from .image_variants import VARIANTS_DIR
+from .models import Recipe
+
+
+def _file_fields():
+    return ((Recipe, "image"), (get_user_model(), "avatar"))
+
+
+def remember_loaded_file(instance, field):
+    """Запоминает имя файла, с которым экземпляр создан (для post_init).
+
+    Так post_save узнает о смене файла без дополнительного SELECT.
+    """
+    if field in instance.__dict__:
+        value = instance.__dict__[field]
+        instance.__dict__[f"_loaded_{field}"] = getattr(value, "name", value)
+
+
+def file_replaced(instance, field):
+    """Сменился ли файл с момента загрузки экземпляра (для post_save).
+
+    Запоминает текущее имя, чтобы следующее сохранение сравнивалось уже
+    с ним. Если исходное имя неизвестно, файл считается замененным.
+    """
+    if field in instance.get_deferred_fields():
+        return False
+    name = getattr(instance, field).name
+    key = f"_loaded_{field}"
+    replaced = key not in instance.__dict__ or instance.__dict__[key] != name
+    instance.__dict__[key] = name
+    return replaced
+
+
+def referenced_names():
+    names = set()
+    for model, field in _file_fields():
+        names.update(
+            model.objects.exclude(**{field: ""})
+            .exclude(**{f"{field}__isnull": True})
+            .values_list(field, flat=True)
+        )
+    return names
+
+
+def _original_key(path):
+    return str(path.parent), path.stem
+
+
+def find_orphans(root=None, grace_period=MEDIA_GC_GRACE_PERIOD):
+    """Файлы в MEDIA_ROOT, на которые не ссылается ни одна запись.
+
+    Файлы моложе grace_period секунд пропускаются: они могут
+    принадлежать загрузке, транзакция которой еще не зафиксирована.
+    Хранилище обновляет время изменения и при повторной записи тех же
+    байтов, поэтому защищены и файлы, снова загруженные другой записью.
+    Удаляются файлы только здесь, а не при удалении или замене ссылки:
+    иначе проверка ссылок и удаление гонялись бы с такой загрузкой.
+    """
+    root = root or default_storage.location
+    referenced = referenced_names()
+    deadline = time.time() - grace_period
+    modified = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            path = os.path.relpath(full_path, root).replace(os.sep, "/")
+            modified[path] = os.path.getmtime(full_path)
+    # Варианты нужны, пока нужен оригинал: на него ссылаются или его
+    # только что загрузили.
+    originals = {
+        _original_key(PurePosixPath(name))
+        for name in referenced
+        | {path for path, mtime in modified.items() if mtime > deadline}
+    }
+    orphans = []
+    for path, mtime in modified.items():
+        if mtime > deadline:
+            continue
+        path = PurePosixPath(path)
+        if path.parent.name == VARIANTS_DIR:
+            key = (
+                str(path.parent.parent),
+                path.stem.rsplit("_", 1)[0],
+            )
+            if key in originals:
+                continue
+        elif str(path) in referenced:
+            continue
+        orphans.append(str(path))
+    return sorted(orphans)
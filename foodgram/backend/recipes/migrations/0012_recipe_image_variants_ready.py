@@ -0,0 +1,58 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:13
+
+from pathlib import PurePosixPath
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+# Снимок recipes.image_variants на момент миграции: код приложения может
+# измениться, а миграция должна применяться с нуля как есть.
+VARIANT_EXTENSIONS = {'thumbnail': 'jpg', 'webp': 'webp'}
+
+
+def variant_name(name, variant):
+    path = PurePosixPath(name)
+    extension = VARIANT_EXTENSIONS[variant]
+    return str(path.parent / 'variants' / f'{path.stem}_{variant}.{extension}')
+
+
+def mark_ready(model, field):
+    names = (
+        model.objects.exclude(**{field: ''})
+        .exclude(**{f'{field}__isnull': True})
+        .values_list(field, flat=True)
+        .distinct()
+    )
+    ready = [
+        name
+        for name in names
+        if all(
+            default_storage.exists(variant_name(name, variant))
+            for variant in VARIANT_EXTENSIONS
+        )
+    ]
+    model.objects.filter(**{f'{field}__in': ready}).update(
+        **{f'{field}_variants_ready': True}
+    )
+
+
+def fill_variants_ready(apps, schema_editor):
+    mark_ready(apps.get_model('recipes', 'Recipe'), 'image')
+    mark_ready(apps.get_model('users', 'User'), 'avatar')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_similarrecipe'),
+        ('users', '0007_user_avatar_variants_ready'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_variants_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Варианты изображения готовы'),
+        ),
+        migrations.RunPython(fill_variants_ready, migrations.RunPython.noop),
+    ]
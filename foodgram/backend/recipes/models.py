@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.crypto import get_random_string
@@ -65,6 +66,32 @@ class Ingredient(models.Model):
         return f"{self.name} ({self.measurement_unit})"
 
 
+class RecipeQuerySet(models.QuerySet):
+    def with_user_flags(self, user):
+        """Аннотирует is_favorited и is_in_shopping_cart для пользователя."""
+        if not user or not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        return self.annotate(
+            is_favorited=models.Exists(
+                Favorite.objects.filter(
+                    user=user, recipe=models.OuterRef("pk")
+                )
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCart.objects.filter(
+                    user=user, recipe=models.OuterRef("pk")
+                )
+            ),
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -114,6 +141,23 @@ class Recipe(models.Model):
         null=True,
         verbose_name="Короткий код",
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В избранном",
+    )
+    image_variants_ready = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Варианты изображения готовы",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name="Поисковый вектор",
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ("-pub_date", "name")
@@ -243,3 +287,106 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f"{self.user} - {self.recipe}"
+
+
+class ShoppingListItem(models.Model):
+    """Суммарное количество ингредиента в списке покупок пользователя.
+
+    Материализованная сумма IngredientAmount.amount по рецептам из
+    ShoppingCart. Поддерживается модулем recipes.shopping_list, полностью
+    пересчитывается командой rebuild_shopping_lists.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="shopping_list",
+        verbose_name="Пользователь",
+    )
+    ingredient = models.ForeignKey(
+        "Ingredient",
+        on_delete=models.CASCADE,
+        related_name="shopping_list_items",
+        verbose_name="Ингредиент",
+    )
+    amount = models.PositiveIntegerField(verbose_name="Количество")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "ingredient"),
+                name="uniq_shopping_list_user_ingredient",
+            )
+        ]
+        verbose_name = "Позиция списка покупок"
+        verbose_name_plural = "Позиции списка покупок"
+
+    def __str__(self):
+        return f"{self.user} - {self.ingredient} x {self.amount}"
+
+
+class SimilarRecipe(models.Model):
+    """Предрассчитанный похожий рецепт.
+
+    Заполняется командой refresh_similar_recipes (см. recipes.similarity):
+    для каждого рецепта хранятся top-K соседей по косинусному сходству
+    состава и тегов.
+    """
+
+    recipe = models.ForeignKey(
+        "Recipe",
+        on_delete=models.CASCADE,
+        related_name="similar_recipes",
+        verbose_name="Рецепт",
+    )
+    similar = models.ForeignKey(
+        "Recipe",
+        on_delete=models.CASCADE,
+        related_name="similar_to",
+        verbose_name="Похожий рецепт",
+    )
+    score = models.FloatField(verbose_name="Сходство")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("recipe", "similar"), name="uniq_similar_recipe"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=("recipe", "-score"), name="similar_recipe_score_idx"
+            )
+        ]
+        ordering = ("recipe", "-score")
+        verbose_name = "Похожий рецепт"
+        verbose_name_plural = "Похожие рецепты"
+
+    def __str__(self):
+        return f"{self.recipe} ~ {self.similar} ({self.score:.3f})"
+
+
+class RecipeSearchIndex(models.Model):
+    """Таблица FTS5 поиска по рецептам на SQLite (миграция 0010).
+
+    Неуправляемая модель нужна, чтобы присоединять индекс к рецептам
+    средствами ORM (см. recipes.search). document — скрытая колонка FTS5
+    с именем таблицы, по ней выполняются MATCH и bm25. На PostgreSQL
+    такой таблицы нет, и модель не используется.
+    """
+
+    recipe = models.OneToOneField(
+        "Recipe",
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="search_index",
+    )
+    name = models.TextField()
+    text = models.TextField()
+    document = models.TextField(db_column="recipes_recipe_fts")
+
+    class Meta:
+        managed = False
+        db_table = "recipes_recipe_fts"
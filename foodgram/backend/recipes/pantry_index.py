@@ -0,0 +1,216 @@
+import json
+import threading
+from collections import defaultdict
+
+from django.db import connections, transaction
+from django.db.models.expressions import RawSQL
+
+from .models import IngredientAmount
+from .reference_cache import bump_version, get_version
+
+RECIPE_INGREDIENTS = "recipe_ingredients"
+
+
+def _bitset(ids, size):
+    # Собирать множество через bytearray быстрее, чем сдвигами: каждая
+    # операция над большим int создает новый объект длиной во весь индекс.
+    data = bytearray(size // 8 + 1)
+    for number in ids:
+        data[number >> 3] |= 1 << (number & 7)
+    return int.from_bytes(data, "little")
+
+
+def _members(bits):
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    ids = []
+    for position, byte in enumerate(data):
+        if byte:
+            base = position * 8
+            ids.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return ids
+
+
+def _add_to_counter(planes, bits):
+    # Битовые плоскости хранят для каждого рецепта число совпавших
+    # ингредиентов в двоичном виде: planes[j] — j-й разряд счетчика.
+    carry = bits
+    for position, plane in enumerate(planes):
+        if not carry:
+            return
+        planes[position], carry = plane ^ carry, plane & carry
+    if carry:
+        planes.append(carry)
+
+
+def _at_least(planes, threshold, candidates):
+    """Рецепты из candidates, у которых счетчик не меньше threshold."""
+    greater, equal = 0, candidates
+    for position in reversed(
+        range(max(len(planes), threshold.bit_length()))
+    ):
+        plane = planes[position] if position < len(planes) else 0
+        if threshold >> position & 1:
+            equal &= plane
+        else:
+            greater |= equal & plane
+            equal &= ~plane
+        if not equal:
+            break
+    return greater | equal
+
+
+class PantryRecipeIndex:
+    """Инвертированный индекс «ингредиент → множество рецептов» в памяти.
+
+    Множества рецептов хранятся битовыми масками в int (бит с номером id
+    рецепта), поэтому пересечения и объединения выполняются побитовыми
+    операциями над всем каталогом сразу. Рецепты дополнительно сгруппированы
+    по числу ингредиентов: рецепт из n ингредиентов подходит, если из
+    набора пользователя в нем есть хотя бы n - max_missing.
+
+    Индекс привязан к версии в кеше: изменения рецептов в этом процессе
+    применяются точечно после фиксации транзакции, а если версию поднял
+    другой процесс, индекс перестраивается при следующем запросе.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._recipes = None
+        self._by_ingredient = None
+        self._by_count = None
+
+    def _rebuild(self):
+        recipes = defaultdict(set)
+        rows = IngredientAmount.objects.values_list(
+            "recipe_id", "ingredient_id"
+        )
+        for recipe_id, ingredient_id in rows.iterator(chunk_size=10_000):
+            recipes[recipe_id].add(ingredient_id)
+        size = max(recipes, default=0)
+        by_ingredient = defaultdict(list)
+        by_count = defaultdict(list)
+        for recipe_id, ingredient_ids in recipes.items():
+            by_count[len(ingredient_ids)].append(recipe_id)
+            for ingredient_id in ingredient_ids:
+                by_ingredient[ingredient_id].append(recipe_id)
+        self._recipes = {
+            recipe_id: frozenset(ingredient_ids)
+            for recipe_id, ingredient_ids in recipes.items()
+        }
+        self._by_ingredient = {
+            key: _bitset(ids, size) for key, ids in by_ingredient.items()
+        }
+        self._by_count = {
+            key: _bitset(ids, size) for key, ids in by_count.items()
+        }
+
+    def _ensure_current(self):
+        # Версию читаем до построения: если ее поднимут во время чтения
+        # таблицы, следующий запрос перестроит индекс еще раз.
+        version = get_version(RECIPE_INGREDIENTS)
+        if self._recipes is None or self._version != version:
+            self._rebuild()
+            self._version = version
+
+    def _discard(self, recipe_id):
+        ingredient_ids = self._recipes.pop(recipe_id, None)
+        if ingredient_ids is None:
+            return
+        mask = ~(1 << recipe_id)
+        for ingredient_id in ingredient_ids:
+            self._by_ingredient[ingredient_id] &= mask
+        self._by_count[len(ingredient_ids)] &= mask
+
+    def _store(self, recipe_id, ingredient_ids):
+        if not ingredient_ids:
+            return
+        bit = 1 << recipe_id
+        self._recipes[recipe_id] = ingredient_ids
+        for ingredient_id in ingredient_ids:
+            self._by_ingredient[ingredient_id] = (
+                self._by_ingredient.get(ingredient_id, 0) | bit
+            )
+        count = len(ingredient_ids)
+        self._by_count[count] = self._by_count.get(count, 0) | bit
+
+    def _apply_after_commit(self, recipe_id, load):
+        def apply():
+            version = bump_version(RECIPE_INGREDIENTS)
+            with self._lock:
+                if self._recipes is None:
+                    return
+                if self._version != version - 1:
+                    # Пропущены чужие изменения — перестроимся при запросе.
+                    self._recipes = None
+                    return
+                self._discard(recipe_id)
+                self._store(recipe_id, frozenset(load() if load else ()))
+                self._version = version
+
+        transaction.on_commit(apply)
+
+    def refresh_recipe(self, recipe_id):
+        """Перечитывает состав рецепта после фиксации транзакции."""
+        self._apply_after_commit(
+            recipe_id,
+            lambda: IngredientAmount.objects.filter(
+                recipe_id=recipe_id
+            ).values_list("ingredient_id", flat=True),
+        )
+
+    def remove_recipe(self, recipe_id):
+        """Убирает рецепт из индекса после фиксации транзакции."""
+        self._apply_after_commit(recipe_id, None)
+
+    def invalidate(self):
+        """Перестраивает индекс во всех процессах при следующем запросе."""
+        transaction.on_commit(lambda: bump_version(RECIPE_INGREDIENTS))
+
+    def cookable(self, ingredient_ids, max_missing=0):
+        """Id рецептов, которым не хватает не более max_missing ингредиентов.
+
+        Учитываются только рецепты, в которых есть хотя бы один ингредиент
+        из ingredient_ids. Результат отсортирован по возрастанию id.
+        """
+        with self._lock:
+            self._ensure_current()
+            planes = []
+            for ingredient_id in set(ingredient_ids):
+                bits = self._by_ingredient.get(ingredient_id)
+                if bits:
+                    _add_to_counter(planes, bits)
+            if not planes:
+                return []
+            found = 0
+            for count, candidates in self._by_count.items():
+                threshold = max(count - max_missing, 1)
+                found |= _at_least(planes, threshold, candidates)
+        return _members(found)
+
+
+pantry_index = PantryRecipeIndex()
+
+
+def filter_cookable(queryset, ingredient_ids, max_missing=0):
+    """Оставляет рецепты, которые можно приготовить из ingredient_ids.
+
+    Id найденных рецептов может быть десятки тысяч, поэтому на PostgreSQL
+    и SQLite они передаются в запрос одним параметром (массивом и JSON
+    соответственно), а не отдельным параметром на каждый id.
+    """
+    ids = pantry_index.cookable(ingredient_ids, max_missing)
+    if not ids:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return queryset.filter(
+            pk__in=RawSQL("SELECT unnest(%s::bigint[])", (ids,))
+        )
+    if vendor == "sqlite":
+        return queryset.filter(
+            pk__in=RawSQL(
+                "SELECT value FROM json_each(%s)", (json.dumps(ids),)
+            )
+        )
+    return queryset.filter(pk__in=ids)
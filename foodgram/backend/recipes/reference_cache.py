@@ -0,0 +1,57 @@
+import time
+
+from django.core.cache import cache
+
+from config.constants import REFERENCE_CACHE_TIMEOUT
+from .models import Tag
+
+TAGS = "tags"
+INGREDIENTS = "ingredients"
+
+VERSION_KEY = "reference:{namespace}:version"
+
+
+def get_version(namespace):
+    """Возвращает текущую версию справочника.
+
+    Если ключа версии нет в кеше (первый запуск или вытеснение), он
+    заполняется текущим временем, чтобы не совпасть ни с одной из версий,
+    под которыми уже могли лежать ответы.
+    """
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """Делает недействительными все закешированные ответы справочника.
+
+    Возвращает новую версию.
+    """
+    key = VERSION_KEY.format(namespace=namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def versioned_key(namespace, name):
+    """Ключ кеша, привязанный к текущей версии справочника."""
+    return "reference:{namespace}:{version}:{name}".format(
+        namespace=namespace, version=get_version(namespace), name=name
+    )
+
+
+def get_tag_ids_by_slug():
+    """Возвращает словарь slug -> id тегов из кеша."""
+    key = versioned_key(TAGS, "slugs")
+    tag_ids = cache.get(key)
+    if tag_ids is None:
+        tag_ids = dict(Tag.objects.values_list("slug", "id"))
+        cache.set(key, tag_ids, REFERENCE_CACHE_TIMEOUT)
+    return tag_ids
@@ -0,0 +1,154 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import (
+    BooleanField,
+    F,
+    FloatField,
+    Func,
+    Q,
+    Value,
+)
+
+# Веса bm25 для колонок name и text таблицы FTS5.
+FTS_NAME_WEIGHT = 10.0
+FTS_TEXT_WEIGHT = 1.0
+SEARCH_CONFIG = "russian"
+
+FTS_TABLE = "recipes_recipe_fts"
+# Триггеры синхронизации из миграции 0010. SQLite выполняет многие
+# изменения схемы (например, AddField с NOT NULL) пересозданием таблицы
+# recipes_recipe, и ее триггеры пропадают вместе со старой таблицей.
+SQLITE_FTS_TRIGGERS = {
+    "recipes_recipe_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_insert
+        AFTER INSERT ON recipes_recipe
+        BEGIN
+            INSERT INTO recipes_recipe_fts(rowid, name, text)
+            VALUES (new.id, new.name, new.text);
+        END
+    """,
+    "recipes_recipe_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_delete
+        AFTER DELETE ON recipes_recipe
+        BEGIN
+            INSERT INTO recipes_recipe_fts(
+                recipes_recipe_fts, rowid, name, text
+            )
+            VALUES ('delete', old.id, old.name, old.text);
+        END
+    """,
+    "recipes_recipe_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_update
+        AFTER UPDATE OF name, text ON recipes_recipe
+        BEGIN
+            INSERT INTO recipes_recipe_fts(
+                recipes_recipe_fts, rowid, name, text
+            )
+            VALUES ('delete', old.id, old.name, old.text);
+            INSERT INTO recipes_recipe_fts(rowid, name, text)
+            VALUES (new.id, new.name, new.text);
+        END
+    """,
+}
+
+
+def _fts5_match(query):
+    """Строит выражение MATCH: все слова запроса, каждое как префикс.
+
+    В FTS5 нет русского стеммера, поэтому окончания покрываются поиском
+    по префиксу. Слова берутся в кавычки, чтобы синтаксис FTS5 из
+    пользовательского ввода не интерпретировался.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+
+
+class _Match(Func):
+    arg_joiner = " MATCH "
+    template = "%(expressions)s"
+    output_field = BooleanField()
+
+
+class _BM25(Func):
+    function = "bm25"
+    output_field = FloatField()
+
+
+def _search_sqlite(queryset, query):
+    match = _fts5_match(query)
+    if not match:
+        return queryset.none()
+    # Таблица FTS5 присоединяется по rowid (RecipeSearchIndex): MATCH и
+    # bm25 считаются за один проход по индексу. Коррелированный
+    # подзапрос bm25 на каждую строку пересчитывал бы статистику индекса
+    # заново и работал квадратично.
+    document = F("search_index__document")
+    return (
+        # isnull=False делает соединение внутренним: с LEFT JOIN SQLite
+        # не может передать MATCH в виртуальную таблицу.
+        queryset.filter(
+            _Match(document, Value(match)), search_index__isnull=False
+        )
+        .annotate(
+            search_rank=-_BM25(
+                document, Value(FTS_NAME_WEIGHT), Value(FTS_TEXT_WEIGHT)
+            )
+        )
+        .order_by("-search_rank", "-id")
+    )
+
+
+def _search_postgresql(queryset, query):
+    search_query = SearchQuery(
+        query, config=SEARCH_CONFIG, search_type="websearch"
+    )
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(search_rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-search_rank", "-id")
+    )
+
+
+def restore_fts_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Обработчик post_migrate: возвращает триггеры FTS5 на SQLite.
+
+    Если какого-то триггера не было, индекс мог отстать от таблицы, и он
+    перестраивается целиком. До миграции 0010 (таблицы FTS5 нет) ничего
+    не делает.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [f"{FTS_TABLE}%"],
+        )
+        existing = {name for name, in cursor.fetchall()}
+        if FTS_TABLE not in existing or not (
+            SQLITE_FTS_TRIGGERS.keys() - existing
+        ):
+            return
+        for statement in SQLITE_FTS_TRIGGERS.values():
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def search_recipes(queryset, query):
+    """Полнотекстовый поиск рецептов с сортировкой по релевантности.
+
+    На PostgreSQL используется поддерживаемый триггером search_vector
+    (название с весом A, описание с весом B, русская морфология) с
+    GIN-индексом, на SQLite — таблица FTS5. На прочих БД поиск сводится
+    к icontains.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _search_postgresql(queryset, query)
+    if vendor == "sqlite":
+        return _search_sqlite(queryset, query)
+    return queryset.filter(Q(name__icontains=query) | Q(text__icontains=query))
@@ -0,0 +1,227 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import IngredientAmount, ShoppingCart, ShoppingListItem
+from .reference_cache import bump_version, get_version
+
+SHOPPING_LISTS = "shopping_lists"
+
+
+def _cart_namespace(user_id):
+    return f"shopping_list:{user_id}"
+
+
+def get_cart_version(user_id):
+    """Версия списка покупок пользователя для ключей кеша выгрузки."""
+    return "{}.{}".format(
+        get_version(SHOPPING_LISTS), get_version(_cart_namespace(user_id))
+    )
+
+
+def _bump_cart_versions(user_ids=None):
+    # Версия меняется только после фиксации транзакции, иначе параллельный
+    # запрос успел бы закешировать старые данные под новой версией.
+    namespaces = (
+        [SHOPPING_LISTS]
+        if user_ids is None
+        else [_cart_namespace(user_id) for user_id in user_ids]
+    )
+
+    def bump():
+        for namespace in namespaces:
+            bump_version(namespace)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_exports():
+    """Сбрасывает кеш выгрузок всех списков покупок.
+
+    Названия и единицы измерения ингредиентов попадают в файлы выгрузки,
+    поэтому их изменение устаревает списки без изменения корзин.
+    """
+    _bump_cart_versions()
+
+
+def _recipe_amounts(recipe_id):
+    return dict(
+        IngredientAmount.objects.filter(recipe_id=recipe_id).values_list(
+            "ingredient_id", "amount"
+        )
+    )
+
+
+def _lock_users(user_ids):
+    """Блокирует строки пользователей до конца транзакции.
+
+    Все изменения списка покупок пользователя идут под этой блокировкой:
+    иначе два параллельных запроса могли бы не увидеть строк друг друга и
+    оба вставить одну и ту же (IntegrityError). Строки блокируются по
+    порядку pk, чтобы пересчет по нескольким пользователям не приводил к
+    взаимоблокировкам.
+    """
+    list(
+        get_user_model()
+        .objects.select_for_update()
+        .filter(pk__in=user_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def _apply_deltas(user_id, deltas):
+    """Прибавляет deltas {ingredient_id: количество} к списку покупок."""
+    if not deltas:
+        return
+    with transaction.atomic():
+        _lock_users([user_id])
+        existing = {
+            item.ingredient_id: item
+            for item in ShoppingListItem.objects.filter(
+                user_id=user_id, ingredient_id__in=deltas
+            )
+        }
+        to_create, to_update, to_delete = [], [], []
+        for ingredient_id, delta in deltas.items():
+            item = existing.get(ingredient_id)
+            if item is None:
+                if delta > 0:
+                    to_create.append(
+                        ShoppingListItem(
+                            user_id=user_id,
+                            ingredient_id=ingredient_id,
+                            amount=delta,
+                        )
+                    )
+                continue
+            item.amount += delta
+            if item.amount > 0:
+                to_update.append(item)
+            else:
+                to_delete.append(item.pk)
+        ShoppingListItem.objects.bulk_create(to_create)
+        ShoppingListItem.objects.bulk_update(to_update, ["amount"])
+        ShoppingListItem.objects.filter(pk__in=to_delete).delete()
+        _bump_cart_versions([user_id])
+
+
+def add_recipe(user_id, recipe_id):
+    """Учитывает ингредиенты рецепта, добавленного в список покупок."""
+    _apply_deltas(user_id, _recipe_amounts(recipe_id))
+
+
+def remove_recipe(user_id, recipe_id):
+    """Вычитает ингредиенты рецепта, убранного из списка покупок."""
+    _apply_deltas(
+        user_id,
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount in _recipe_amounts(recipe_id).items()
+        },
+    )
+
+
+def change_cart(user_id, added=(), removed=()):
+    """Учитывает разом рецепты, добавленные в корзину и убранные из нее.
+
+    Ингредиенты всех рецептов читаются одним запросом, а их суммарные
+    изменения применяются одним вызовом _apply_deltas.
+    """
+    signs = dict.fromkeys(added, 1) | dict.fromkeys(removed, -1)
+    if not signs:
+        return
+    deltas = defaultdict(int)
+    for recipe_id, ingredient_id, amount in IngredientAmount.objects.filter(
+        recipe_id__in=signs
+    ).values_list("recipe_id", "ingredient_id", "amount"):
+        deltas[ingredient_id] += signs[recipe_id] * amount
+    _apply_deltas(
+        user_id,
+        {
+            ingredient_id: delta
+            for ingredient_id, delta in deltas.items()
+            if delta
+        },
+    )
+
+
+def _totals(user_ids=None, ingredient_ids=None):
+    """Суммы ингредиентов по корзинам, посчитанные по исходным таблицам."""
+    # Условия на корзину задаются одним filter(), чтобы values() ниже
+    # переиспользовал тот же JOIN с ShoppingCart.
+    cart_lookup = {"recipe__in_carts__isnull": False}
+    if user_ids is not None:
+        cart_lookup = {"recipe__in_carts__user_id__in": user_ids}
+    amounts = IngredientAmount.objects.filter(**cart_lookup)
+    if ingredient_ids is not None:
+        amounts = amounts.filter(ingredient_id__in=ingredient_ids)
+    return (
+        amounts.values("ingredient_id", user_id=F("recipe__in_carts__user"))
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+
+
+def _rebuild(user_ids=None, ingredient_ids=None):
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    if ingredient_ids is not None:
+        items = items.filter(ingredient_id__in=ingredient_ids)
+    with transaction.atomic():
+        if user_ids is not None:
+            _lock_users(user_ids)
+        items.delete()
+        ShoppingListItem.objects.bulk_create(
+            ShoppingListItem(
+                user_id=row["user_id"],
+                ingredient_id=row["ingredient_id"],
+                amount=row["total"],
+            )
+            for row in _totals(user_ids, ingredient_ids)
+        )
+        _bump_cart_versions(user_ids)
+
+
+def refresh_recipe(recipe_id, ingredient_ids):
+    """Пересчитывает ingredient_ids у всех, чья корзина содержит рецепт.
+
+    Вызывается после изменения состава рецепта; ingredient_ids должен
+    включать и прежние, и новые ингредиенты.
+    """
+    user_ids = list(
+        ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+            "user_id", flat=True
+        )
+    )
+    if user_ids:
+        _rebuild(user_ids, ingredient_ids)
+
+
+def rebuild_all():
+    """Пересчитывает списки покупок всех пользователей с нуля."""
+    _rebuild()
+
+
+def find_mismatches():
+    """Возвращает {(user_id, ingredient_id): (сохранено, ожидается)}."""
+    stored = {
+        (user_id, ingredient_id): amount
+        for user_id, ingredient_id, amount in (
+            ShoppingListItem.objects.values_list(
+                "user_id", "ingredient_id", "amount"
+            )
+        )
+    }
+    expected = {
+        (row["user_id"], row["ingredient_id"]): row["total"]
+        for row in _totals()
+    }
+    return {
+        key: (stored.get(key), expected.get(key))
+        for key in stored.keys() | expected.keys()
+        if stored.get(key) != expected.get(key)
+    }
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from . import shopping_list
+from .counters import change_counter
+from .image_variants import schedule_variants
+from .ingredient_index import ingredient_index
+from .media_files import file_replaced, remember_loaded_file
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from .pantry_index import pantry_index
+from .reference_cache import INGREDIENTS, TAGS, bump_version
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(**kwargs):
+    ingredient_index.invalidate()
+    bump_version(INGREDIENTS)
+    shopping_list.invalidate_exports()
+
+
+@receiver(post_delete, sender=Ingredient)
+def invalidate_pantry_index(**kwargs):
+    # Каскадное удаление IngredientAmount не вызывает сигналов по рецептам.
+    pantry_index.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tags(**kwargs):
+    bump_version(TAGS)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_list(instance, created, **kwargs):
+    if created:
+        shopping_list.add_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_from_shopping_list(instance, **kwargs):
+    # pre_delete: при каскадном удалении рецепта его ингредиенты еще на месте.
+    shopping_list.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(instance, created, **kwargs):
+    if created:
+        change_counter(
+            Recipe.objects.filter(pk=instance.recipe_id), "favorites_count", 1
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id), "favorites_count", -1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(instance, created, **kwargs):
+    if created:
+        change_counter(
+            get_user_model().objects.filter(pk=instance.author_id),
+            "recipes_count",
+            1,
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(instance, **kwargs):
+    change_counter(
+        get_user_model().objects.filter(pk=instance.author_id),
+        "recipes_count",
+        -1,
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def generate_recipe_image_variants(instance, created, **kwargs):
+    if created or file_replaced(instance, "image"):
+        schedule_variants(instance, "image")
+
+
+@receiver(post_init, sender=Recipe)
+def remember_recipe_image(instance, **kwargs):
+    remember_loaded_file(instance, "image")
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_pantry_index(instance, **kwargs):
+    pantry_index.remove_recipe(instance.pk)
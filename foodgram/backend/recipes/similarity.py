@@ -0,0 +1,129 @@
+import heapq
+import math
+from collections import defaultdict
+from operator import itemgetter
+
+from django.db import transaction
+
+from config.constants import (
+    SIMILAR_RECIPES_MAX_POSTINGS,
+    SIMILAR_RECIPES_TAG_WEIGHT,
+    SIMILAR_RECIPES_TOP_K,
+)
+from .models import IngredientAmount, Recipe, SimilarRecipe
+
+INGREDIENT = "i"
+TAG = "t"
+SHORTLIST_FACTOR = 5
+
+
+def _load_features():
+    features = defaultdict(dict)
+    rows = IngredientAmount.objects.values_list("recipe_id", "ingredient_id")
+    for recipe_id, ingredient_id in rows.iterator(chunk_size=10_000):
+        features[recipe_id][(INGREDIENT, ingredient_id)] = 1.0
+    rows = Recipe.tags.through.objects.values_list("recipe_id", "tag_id")
+    for recipe_id, tag_id in rows.iterator(chunk_size=10_000):
+        features[recipe_id][(TAG, tag_id)] = SIMILAR_RECIPES_TAG_WEIGHT
+    return features
+
+
+def _vectors(features):
+    """Нормированные TF-IDF векторы рецептов в виде разреженных словарей."""
+    frequency = defaultdict(int)
+    for vector in features.values():
+        for feature in vector:
+            frequency[feature] += 1
+    total = len(features)
+    vectors = {}
+    for recipe_id, vector in features.items():
+        # Признак, который есть у всех рецептов, ничего не различает.
+        weighted = {
+            feature: weight * math.log(total / frequency[feature])
+            for feature, weight in vector.items()
+            if frequency[feature] < total
+        }
+        norm = math.sqrt(sum(value * value for value in weighted.values()))
+        if norm:
+            vectors[recipe_id] = {
+                feature: value / norm for feature, value in weighted.items()
+            }
+    return vectors
+
+
+def compute_similar(top_k=SIMILAR_RECIPES_TOP_K):
+    """Возвращает для каждого рецепта top_k соседей: [(id, сходство)].
+
+    Рецепты — разреженные векторы ингредиентов и тегов (тег весит
+    SIMILAR_RECIPES_TAG_WEIGHT ингредиента) с весами IDF, сходство —
+    косинус. Кандидаты набираются по инвертированным спискам редких
+    признаков, а списки длиннее SIMILAR_RECIPES_MAX_POSTINGS (соль,
+    популярные теги) только уточняют сходство уже найденных кандидатов:
+    иначе расчет был бы квадратичным по числу рецептов. Сходство по
+    частым признакам досчитывается для SHORTLIST_FACTOR * top_k лучших
+    кандидатов.
+    """
+    vectors = _vectors(_load_features())
+    postings = defaultdict(list)
+    for recipe_id, vector in vectors.items():
+        for feature, value in vector.items():
+            postings[feature].append((recipe_id, value))
+    selective = {
+        feature
+        for feature, entries in postings.items()
+        if len(entries) <= SIMILAR_RECIPES_MAX_POSTINGS
+    }
+    neighbours = {}
+    for recipe_id, vector in vectors.items():
+        sources = [feature for feature in vector if feature in selective]
+        if not sources:
+            # Рецепт только из частых ингредиентов: берем самый редкий.
+            sources = [min(vector, key=lambda feature: len(postings[feature]))]
+        scores = defaultdict(float)
+        for feature in sources:
+            value = vector[feature]
+            for other_id, other_value in postings[feature]:
+                scores[other_id] += value * other_value
+        scores.pop(recipe_id, None)
+        common = [
+            (feature, value)
+            for feature, value in vector.items()
+            if feature not in sources
+        ]
+        if common:
+            # Вклад частых признаков мал (низкий IDF), поэтому уточняется
+            # только верх списка кандидатов, а не все кандидаты.
+            shortlist = heapq.nlargest(
+                top_k * SHORTLIST_FACTOR, scores.items(), key=itemgetter(1)
+            )
+            scores = {
+                other_id: score
+                + sum(
+                    value * vectors[other_id].get(feature, 0.0)
+                    for feature, value in common
+                )
+                for other_id, score in shortlist
+            }
+        neighbours[recipe_id] = heapq.nsmallest(
+            top_k,
+            scores.items(),
+            key=lambda item: (-item[1], item[0]),
+        )
+    return neighbours
+
+
+def refresh_similar_recipes(top_k=SIMILAR_RECIPES_TOP_K, batch_size=5000):
+    """Пересчитывает таблицу SimilarRecipe целиком.
+
+    Возвращает число сохраненных пар.
+    """
+    neighbours = compute_similar(top_k)
+    rows = [
+        SimilarRecipe(recipe_id=recipe_id, similar_id=other_id, score=score)
+        for recipe_id, similar in neighbours.items()
+        for other_id, score in similar
+    ]
+    with transaction.atomic():
+        SimilarRecipe.objects.all().delete()
+        SimilarRecipe.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
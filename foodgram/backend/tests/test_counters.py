@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Recipe
+from users.models import User
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f"{name}@example.com",
+        username=name,
+        first_name=name,
+        last_name=name,
+    )
+
+
+def create_recipe(author, name="Суп"):
+    return Recipe.objects.create(
+        author=author,
+        name=name,
+        image="recipes/images/test.png",
+        text="Текст",
+        cooking_time=10,
+    )
+
+
+class DenormalizedCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        cls.reader = create_user("reader")
+
+    def _refresh(self, *objects):
+        for obj in objects:
+            obj.refresh_from_db()
+
+    def test_recipes_count(self):
+        first = create_recipe(self.author)
+        create_recipe(self.author, "Каша")
+        self._refresh(self.author)
+        self.assertEqual(self.author.recipes_count, 2)
+        first.delete()
+        self._refresh(self.author)
+        self.assertEqual(self.author.recipes_count, 1)
+
+    def test_favorites_count(self):
+        recipe = create_recipe(self.author)
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        client.post(f"/api/recipes/{recipe.pk}/favorite/")
+        Favorite.objects.create(user=self.author, recipe=recipe)
+        self._refresh(recipe)
+        self.assertEqual(recipe.favorites_count, 2)
+        client.delete(f"/api/recipes/{recipe.pk}/favorite/")
+        self.reader.delete()
+        self._refresh(recipe)
+        self.assertEqual(recipe.favorites_count, 1)
+
+    def test_reconcile_command(self):
+        recipe = create_recipe(self.author)
+        Favorite.objects.create(user=self.reader, recipe=recipe)
+        Recipe.objects.update(favorites_count=7)
+        User.objects.filter(pk=self.author.pk).update(recipes_count=0)
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("recipes: 1, users: 1", out.getvalue())
+        self._refresh(recipe, self.author)
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(self.author.recipes_count, 1)
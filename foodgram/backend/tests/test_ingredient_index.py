@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Ingredient
+
+
+class IngredientAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit="г")
+            for name in (
+                "соль морская",
+                "Соль",
+                "солод",
+                "сахар",
+                "фасоль",
+            )
+        )
+
+    def setUp(self):
+        ingredient_index.invalidate()
+        cache.clear()
+        self.client = APIClient()
+
+    def test_prefix_search_is_case_insensitive_and_ranked(self):
+        resp = self.client.get("/api/ingredients/", {"name": "СОЛ"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [item["name"] for item in resp.data],
+            ["солод", "Соль", "соль морская"],
+        )
+        resp = self.client.get("/api/ingredients/", {"name": "соль"})
+        self.assertEqual(
+            [item["name"] for item in resp.data],
+            ["Соль", "соль морская"],
+        )
+        self.assertEqual(
+            set(resp.data[0]), {"id", "name", "measurement_unit"}
+        )
+
+    def test_limit(self):
+        self.assertEqual(len(ingredient_index.search("с", limit=2)), 2)
+
+    def test_blank_prefix_finds_nothing(self):
+        self.assertEqual(ingredient_index.search("   "), [])
+        for name in ("", "  "):
+            with self.subTest(name=name):
+                resp = self.client.get("/api/ingredients/", {"name": name})
+                self.assertEqual(resp.json(), [])
+
+    def test_index_is_invalidated_on_write(self):
+        self.assertEqual(ingredient_index.search("мука"), [])
+        Ingredient.objects.create(name="мука", measurement_unit="г")
+        self.assertEqual(len(ingredient_index.search("мука")), 1)
+
+    def test_list_without_name_uses_database(self):
+        resp = self.client.get("/api/ingredients/")
+        self.assertEqual(len(resp.json()), 5)
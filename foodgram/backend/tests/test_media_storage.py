@@ -0,0 +1,130 @@
+import base64
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_data_uri(color="red"):
+    buffer = BytesIO()
+    Image.new("RGB", (64, 64), color).save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_VARIANTS_ASYNC=False)
+class HashedMediaStorageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="cook@example.com",
+            username="cook",
+            first_name="Cook",
+            last_name="Cook",
+        )
+        cls.tag = Tag.objects.create(name="Обед", slug="lunch")
+        cls.ingredient = Ingredient.objects.create(
+            name="соль", measurement_unit="г"
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_recipe(self, image):
+        resp = self.client.post(
+            "/api/recipes/",
+            {
+                "tags": [self.tag.pk],
+                "ingredients": [{"id": self.ingredient.pk, "amount": 5}],
+                "name": "Суп",
+                "image": image,
+                "text": "Текст",
+                "cooking_time": 10,
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 201)
+        return Recipe.objects.get(pk=resp.data["id"])
+
+    def test_identical_content_is_stored_once(self):
+        first = default_storage.save("recipes/a.txt", ContentFile(b"same"))
+        second = default_storage.save("recipes/b.txt", ContentFile(b"same"))
+        self.assertEqual(first, second)
+        self.assertNotEqual(
+            first, default_storage.save("recipes/c.txt", ContentFile(b"new"))
+        )
+
+    def test_shared_file_is_kept_until_garbage_collection(self):
+        image = image_data_uri()
+        first = self._create_recipe(image)
+        second = self._create_recipe(image)
+        name = first.image.name
+        self.assertEqual(name, second.image.name)
+        path = os.path.join(MEDIA_ROOT, name)
+        os.utime(path, (0, 0))
+        # Повторная запись тех же байтов обновляет время изменения.
+        self._create_recipe(image).delete()
+        self.assertGreater(os.path.getmtime(path), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+            self.client.patch(
+                f"/api/recipes/{second.pk}/",
+                {
+                    "tags": [self.tag.pk],
+                    "ingredients": [
+                        {"id": self.ingredient.pk, "amount": 5}
+                    ],
+                    "image": image_data_uri("blue"),
+                },
+                format="json",
+            )
+        self.assertTrue(default_storage.exists(name))
+        call_command(
+            "collect_media_garbage", "--grace-period=0", stdout=StringIO()
+        )
+        self.assertFalse(default_storage.exists(name))
+
+    def test_saving_without_file_change_does_not_reread_row(self):
+        recipe = self._create_recipe(image_data_uri())
+        recipe = Recipe.objects.get(pk=recipe.pk)
+        recipe.name = "Щи"
+        with self.assertNumQueries(1):
+            recipe.save(update_fields=["name"])
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = "Повар"
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_collect_media_garbage(self):
+        recipe = self._create_recipe(image_data_uri())
+        orphan = default_storage.save(
+            "recipes/images/orphan.png", ContentFile(b"orphan")
+        )
+        out = StringIO()
+        call_command(
+            "collect_media_garbage", "--grace-period=0", stdout=out
+        )
+        self.assertIn(orphan, out.getvalue())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(
+            os.path.exists(os.path.join(MEDIA_ROOT, recipe.image.name))
+        )
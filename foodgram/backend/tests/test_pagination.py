@@ -0,0 +1,98 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.pagination import KeysetPagination
+from recipes.models import Recipe
+from users.models import Subscription, User
+
+
+def create_user(number):
+    return User.objects.create_user(
+        email=f"user{number}@example.com",
+        username=f"user{number}",
+        first_name="User",
+        last_name=str(number),
+    )
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(0)
+        cls.authors = [create_user(number) for number in range(1, 8)]
+        for author in cls.authors:
+            Subscription.objects.create(user=cls.user, author=author)
+            Recipe.objects.create(
+                author=author,
+                name=f"Рецепт {author.pk}",
+                image="recipes/images/test.png",
+                text="Текст",
+                cooking_time=10,
+            )
+        Recipe.objects.filter(author__in=cls.authors[:4]).update(
+            pub_date=timezone.now()
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _walk(self, url, params):
+        ids = []
+        resp = self.client.get(url, params)
+        while True:
+            self.assertEqual(resp.status_code, 200)
+            ids.extend(item["id"] for item in resp.data["results"])
+            if not resp.data["next"]:
+                return ids
+            resp = self.client.get(resp.data["next"])
+
+    def test_recipe_feed_cursor_walks_all_recipes_once(self):
+        expected = list(
+            Recipe.objects.order_by("-pub_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        ids = self._walk("/api/recipes/", {"cursor": "", "limit": 3})
+        self.assertEqual(ids, expected)
+
+    def test_subscriptions_cursor(self):
+        ids = self._walk(
+            "/api/users/subscriptions/", {"cursor": "", "limit": 2}
+        )
+        self.assertEqual(ids, [author.pk for author in self.authors])
+
+    def test_count_is_optional(self):
+        resp = self.client.get("/api/recipes/", {"cursor": ""})
+        self.assertNotIn("count", resp.data)
+        resp = self.client.get("/api/recipes/", {"cursor": "", "count": 1})
+        self.assertEqual(resp.data["count"], len(self.authors))
+
+    def test_invalid_cursor(self):
+        resp = self.client.get("/api/recipes/", {"cursor": "broken"})
+        self.assertEqual(resp.status_code, 404)
+
+    def test_tampered_cursor(self):
+        pagination = KeysetPagination()
+        for url, position in (
+            ("/api/recipes/", ["abc", 1]),
+            ("/api/recipes/", [None, "x"]),
+            ("/api/recipes/", [{"a": 1}, 1]),
+            ("/api/recipes/", ["2024-01-01T00:00:00", "x"]),
+            ("/api/users/subscriptions/", ["abc"]),
+            ("/api/users/subscriptions/", [None]),
+            ("/api/users/subscriptions/", [[1]]),
+        ):
+            with self.subTest(url=url, position=position):
+                resp = self.client.get(
+                    url, {"cursor": pagination.encode_cursor(position)}
+                )
+                self.assertEqual(resp.status_code, 404)
+                self.assertEqual(resp.data["detail"], "Некорректный курсор.")
+
+    def test_page_number_mode_is_default(self):
+        resp = self.client.get("/api/recipes/", {"page": 2, "limit": 3})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["count"], len(self.authors))
+        self.assertIn("previous", resp.data)
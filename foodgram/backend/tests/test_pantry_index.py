@@ -0,0 +1,151 @@
+import random
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, IngredientAmount, Recipe
+from recipes.pantry_index import _add_to_counter, _at_least, pantry_index
+from users.models import User
+
+
+class BitSliceCounterTests(TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        sets = [
+            {number for number in range(200) if rng.random() < 0.4}
+            for _ in range(9)
+        ]
+        planes = []
+        for members in sets:
+            _add_to_counter(planes, sum(1 << number for number in members))
+        candidates = sum(1 << number for number in range(0, 200, 3))
+        for threshold in range(1, 12):
+            expected = {
+                number
+                for number in range(0, 200, 3)
+                if sum(number in members for members in sets) >= threshold
+            }
+            found = _at_least(planes, threshold, candidates)
+            self.assertEqual(
+                {number for number in range(200) if found >> number & 1},
+                expected,
+            )
+
+
+class PantryIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        cls.salt, cls.flour, cls.eggs, cls.milk, cls.beet = (
+            Ingredient.objects.create(name=name, measurement_unit="г")
+            for name in ("соль", "мука", "яйца", "молоко", "свекла")
+        )
+        cls.pancakes = cls._recipe(
+            "Блины", (cls.flour, cls.eggs, cls.milk, cls.salt)
+        )
+        cls.omelette = cls._recipe("Омлет", (cls.eggs, cls.milk, cls.salt))
+        cls.borscht = cls._recipe("Борщ", (cls.beet, cls.salt))
+
+    @classmethod
+    def _recipe(cls, name, ingredients):
+        recipe = Recipe.objects.create(
+            author=cls.author,
+            name=name,
+            image="recipes/images/test.png",
+            text="Текст",
+            cooking_time=10,
+        )
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        )
+        return recipe
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _ids(self, *ingredients):
+        return [ingredient.pk for ingredient in ingredients]
+
+    def _names(self, ingredients, **params):
+        resp = self.client.get(
+            "/api/recipes/",
+            {
+                "have_ingredients": ",".join(
+                    str(ingredient.pk) for ingredient in ingredients
+                ),
+                **params,
+            },
+        )
+        self.assertEqual(resp.status_code, 200)
+        return sorted(item["name"] for item in resp.data["results"])
+
+    def test_covered_recipes(self):
+        self.assertEqual(
+            pantry_index.cookable(self._ids(self.eggs, self.milk, self.salt)),
+            [self.omelette.pk],
+        )
+        self.assertEqual(pantry_index.cookable(self._ids(self.flour)), [])
+
+    def test_missing_at_most_k(self):
+        have = self._ids(self.eggs, self.milk, self.salt)
+        self.assertEqual(
+            pantry_index.cookable(have, max_missing=1),
+            sorted([self.pancakes.pk, self.omelette.pk, self.borscht.pk]),
+        )
+        self.assertEqual(
+            pantry_index.cookable(self._ids(self.beet), max_missing=1),
+            [self.borscht.pk],
+        )
+
+    def test_filter_params(self):
+        self.assertEqual(
+            self._names((self.eggs, self.milk, self.salt)), ["Омлет"]
+        )
+        self.assertEqual(
+            self._names((self.eggs, self.milk, self.salt), max_missing=1),
+            ["Блины", "Борщ", "Омлет"],
+        )
+        self.assertEqual(self._names((self.flour,)), [])
+        resp = self.client.get(
+            "/api/recipes/", {"have_ingredients": "1", "max_missing": -1}
+        )
+        self.assertEqual(resp.status_code, 400)
+
+    def test_incremental_updates(self):
+        have = self._ids(self.beet, self.salt)
+        self.assertEqual(pantry_index.cookable(have), [self.borscht.pk])
+        salad = self._recipe("Салат", (self.beet,))
+        with self.captureOnCommitCallbacks(execute=True):
+            pantry_index.refresh_recipe(salad.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                pantry_index.cookable(have),
+                sorted([self.borscht.pk, salad.pk]),
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientAmount.objects.create(
+                recipe=self.borscht, ingredient=self.flour, amount=1
+            )
+            pantry_index.refresh_recipe(self.borscht.pk)
+        self.assertEqual(pantry_index.cookable(have), [salad.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            salad.delete()
+        self.assertEqual(pantry_index.cookable(have), [])
+
+    def test_rebuilds_after_foreign_change(self):
+        have = self._ids(self.eggs, self.milk, self.salt)
+        pantry_index.cookable(have)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.delete()
+        self.assertEqual(
+            pantry_index.cookable(self._ids(self.eggs, self.salt)),
+            [self.omelette.pk],
+        )
@@ -0,0 +1,334 @@
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.test import APIClient
+
+from api.recipes.serializers import RecipeWriteSerializer
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription, User
+
+
+class RecipeListQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Reader",
+            last_name="Reader",
+        )
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        Subscription.objects.create(user=cls.user, author=cls.author)
+        tag = Tag.objects.create(name="Обед", slug="lunch")
+        ingredient = Ingredient.objects.create(
+            name="Соль", measurement_unit="г"
+        )
+        for number in range(8):
+            recipe = Recipe.objects.create(
+                author=cls.author,
+                name=f"Рецепт {number}",
+                image="recipes/images/test.png",
+                text="Текст",
+                cooking_time=10,
+            )
+            recipe.tags.add(tag)
+            IngredientAmount.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=5
+            )
+            if number % 2:
+                Favorite.objects.create(user=cls.user, recipe=recipe)
+            else:
+                ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _list_queries(self, limit):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get("/api/recipes/", {"limit": limit})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["results"]), limit)
+        return resp, context.captured_queries
+
+    def _relation_queries(self, queries, table):
+        return [
+            q for q in queries
+            if f'FROM "{table}"' in q["sql"] and "EXISTS(" not in q["sql"]
+        ]
+
+    def test_flags_are_annotated(self):
+        resp, _ = self._list_queries(8)
+        for item in resp.data["results"]:
+            recipe_number = int(item["name"].split()[-1])
+            self.assertEqual(item["is_favorited"], bool(recipe_number % 2))
+            self.assertEqual(
+                item["is_in_shopping_cart"], not recipe_number % 2
+            )
+            self.assertTrue(item["author"]["is_subscribed"])
+
+    def test_flag_queries_do_not_depend_on_page_size(self):
+        _, small = self._list_queries(2)
+        _, large = self._list_queries(8)
+        for table in ("recipes_favorite", "recipes_shoppingcart"):
+            self.assertEqual(
+                len(self._relation_queries(small, table)),
+                len(self._relation_queries(large, table)),
+            )
+            self.assertFalse(self._relation_queries(large, table))
+
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        _, small = self._list_queries(2)
+        _, large = self._list_queries(8)
+        self.assertEqual(len(small), len(large))
+
+    def test_search_vector_is_not_loaded(self):
+        _, queries = self._list_queries(2)
+        recipe = Recipe.objects.first()
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(f"/api/recipes/{recipe.pk}/")
+        for query in queries + context.captured_queries:
+            self.assertNotIn("search_vector", query["sql"])
+
+
+class TagFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        breakfast = Tag.objects.create(name="Завтрак", slug="breakfast")
+        lunch = Tag.objects.create(name="Обед", slug="lunch")
+        Tag.objects.create(name="Ужин", slug="dinner")
+        for name, tags in (
+            ("Каша", [breakfast]),
+            ("Суп", [lunch]),
+            ("Омлет", [breakfast, lunch]),
+        ):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=name,
+                image="recipes/images/test.png",
+                text="Текст",
+                cooking_time=10,
+            )
+            recipe.tags.set(tags)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _names(self, **params):
+        resp = self.client.get("/api/recipes/", params)
+        self.assertEqual(resp.status_code, 200)
+        return sorted(item["name"] for item in resp.data["results"])
+
+    def test_any_of_tags_without_duplicates(self):
+        self.assertEqual(
+            self._names(tags=["breakfast", "lunch"]),
+            ["Каша", "Омлет", "Суп"],
+        )
+        self.assertEqual(self._names(tags=["breakfast"]), ["Каша", "Омлет"])
+        self.assertEqual(self._names(tags=["dinner"]), [])
+
+    def test_unknown_slug_is_rejected(self):
+        resp = self.client.get("/api/recipes/", {"tags": "brunch"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_tag_choices_are_cached(self):
+        self._names(tags=["lunch"])
+        with CaptureQueriesContext(connection) as context:
+            self._names(tags=["breakfast", "lunch"])
+        for query in context.captured_queries:
+            self.assertNotIn("DISTINCT", query["sql"])
+            self.assertFalse(
+                query["sql"].startswith('SELECT "recipes_tag"."slug"')
+            )
+        Tag.objects.create(name="Перекус", slug="snack")
+        self.assertEqual(self._names(tags=["snack"]), [])
+
+
+class RecipeWriteValidationQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        cls.tags = [
+            Tag.objects.create(name=f"Тег {number}", slug=f"tag-{number}")
+            for number in range(3)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент {number}", measurement_unit="г"
+            )
+            for number in range(30)
+        ]
+        buffer = BytesIO()
+        Image.new("RGB", (8, 8), "red").save(buffer, "PNG")
+        cls.image = "data:image/png;base64," + base64.b64encode(
+            buffer.getvalue()
+        ).decode()
+
+    def _serializer(self, tags, ingredients):
+        return RecipeWriteSerializer(
+            data={
+                "tags": tags,
+                "ingredients": [
+                    {"id": pk, "amount": 10} for pk in ingredients
+                ],
+                "name": "Рецепт",
+                "image": self.image,
+                "text": "Текст",
+                "cooking_time": 10,
+            },
+            context={"request": SimpleNamespace(user=self.user)},
+        )
+
+    def test_ids_are_resolved_with_one_query_per_relation(self):
+        serializer = self._serializer(
+            [tag.pk for tag in self.tags],
+            [ingredient.pk for ingredient in self.ingredients],
+        )
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["tags"], self.tags)
+        self.assertEqual(
+            [
+                item["ingredient"]
+                for item in serializer.validated_data["ingredients"]
+            ],
+            self.ingredients,
+        )
+
+    def test_unknown_ids_are_reported_per_item(self):
+        does_not_exist = PrimaryKeyRelatedField.default_error_messages[
+            "does_not_exist"
+        ]
+        serializer = self._serializer(
+            [self.tags[0].pk, 999],
+            [self.ingredients[0].pk, 999, "abc"],
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors["tags"],
+            [does_not_exist.format(pk_value=999)],
+        )
+        ingredient_errors = serializer.errors["ingredients"]
+        self.assertEqual(ingredient_errors[0], {})
+        self.assertEqual(
+            ingredient_errors[1], {"id": [does_not_exist.format(pk_value=999)]}
+        )
+        self.assertEqual(
+            ingredient_errors[2],
+            {
+                "id": [
+                    PrimaryKeyRelatedField.default_error_messages[
+                        "incorrect_type"
+                    ].format(data_type="str")
+                ]
+            },
+        )
+
+
+class RecipeUpdateWritesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        cls.tag = Tag.objects.create(name="Обед", slug="lunch")
+        cls.salt, cls.flour, cls.eggs = (
+            Ingredient.objects.create(name=name, measurement_unit="г")
+            for name in ("соль", "мука", "яйца")
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author,
+            name="Хлеб",
+            image="recipes/images/test.png",
+            text="Текст",
+            cooking_time=10,
+        )
+        cls.recipe.tags.add(cls.tag)
+        for ingredient, amount in ((cls.salt, 5), (cls.flour, 500)):
+            IngredientAmount.objects.create(
+                recipe=cls.recipe, ingredient=ingredient, amount=amount
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def _update(self, amounts, text="Текст"):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.patch(
+                f"/api/recipes/{self.recipe.pk}/",
+                {
+                    "text": text,
+                    "tags": [self.tag.pk],
+                    "ingredients": [
+                        {"id": ingredient.pk, "amount": amount}
+                        for ingredient, amount in amounts.items()
+                    ],
+                },
+                format="json",
+            )
+        self.assertEqual(resp.status_code, 200)
+        return [
+            query["sql"].split()[0]
+            for query in context.captured_queries
+            if "recipes_ingredientamount" in query["sql"]
+            or "recipes_recipe_tags" in query["sql"]
+        ]
+
+    def _stored(self):
+        return dict(
+            IngredientAmount.objects.filter(recipe=self.recipe).values_list(
+                "ingredient__name", "amount"
+            )
+        )
+
+    def test_unchanged_composition_causes_no_writes(self):
+        statements = self._update(
+            {self.salt: 5, self.flour: 500}, text="Исправленный текст"
+        )
+        self.assertEqual(set(statements), {"SELECT"})
+        self.assertEqual(self._stored(), {"соль": 5, "мука": 500})
+
+    def test_only_differences_are_written(self):
+        statements = self._update({self.flour: 400, self.eggs: 2})
+        self.assertEqual(
+            sorted(set(statements) - {"SELECT"}),
+            ["DELETE", "INSERT", "UPDATE"],
+        )
+        self.assertEqual(statements.count("DELETE"), 1)
+        self.assertEqual(self._stored(), {"мука": 400, "яйца": 2})
@@ -0,0 +1,96 @@
+from unittest import skipUnless
+
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, Tag
+from users.models import User
+
+
+class RecipeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        cls.lunch = Tag.objects.create(name="Обед", slug="lunch")
+        for name, text in (
+            ("Борщ украинский", "Свекла, капуста и картофель."),
+            ("Салат из свеклы", "Подавать к борщу."),
+            ("Блины", "Мука, молоко, яйца."),
+        ):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=name,
+                image="recipes/images/test.png",
+                text=text,
+                cooking_time=10,
+            )
+            if name != "Блины":
+                recipe.tags.add(cls.lunch)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _search(self, query, **params):
+        resp = self.client.get("/api/recipes/", {"search": query, **params})
+        self.assertEqual(resp.status_code, 200)
+        return [item["name"] for item in resp.data["results"]]
+
+    def test_name_match_ranks_above_text_match(self):
+        self.assertEqual(
+            self._search("борщ"), ["Борщ украинский", "Салат из свеклы"]
+        )
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self._search("мука яйца"), ["Блины"])
+        self.assertEqual(self._search("мука капуста"), [])
+
+    def test_updates_are_indexed(self):
+        Recipe.objects.filter(name="Блины").update(name="Оладьи")
+        self.assertEqual(self._search("оладьи"), ["Оладьи"])
+        Recipe.objects.filter(name="Оладьи").delete()
+        self.assertEqual(self._search("мука"), [])
+
+    def test_search_combines_with_filters_and_syntax_is_escaped(self):
+        self.assertEqual(self._search("свекла", tags="lunch", limit=1), [
+            "Борщ украинский"
+        ])
+        self.assertEqual(self._search('"борщ*) ('), [
+            "Борщ украинский", "Салат из свеклы"
+        ])
+        self.assertEqual(self._search("!!!"), [])
+
+    @skipUnless(
+        connection.vendor == "postgresql",
+        "search_vector поддерживается триггером только на PostgreSQL",
+    )
+    def test_search_vector_trigger(self):
+        recipe = Recipe.objects.get(name="Блины")
+        self.assertIsNotNone(
+            Recipe.objects.values_list("search_vector", flat=True).get(
+                pk=recipe.pk
+            )
+        )
+        recipe.text = "Кефир и мука."
+        recipe.save(update_fields=["text"])
+        self.assertEqual(self._search("кефира"), ["Блины"])
+
+    @skipUnless(
+        connection.vendor == "sqlite", "таблица FTS5 есть только на SQLite"
+    )
+    def test_post_migrate_restores_fts_triggers(self):
+        # Так триггеры теряются, когда миграция пересоздает таблицу.
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER recipes_recipe_fts_update")
+        Recipe.objects.filter(name="Блины").update(name="Оладьи")
+        self.assertEqual(self._search("оладьи"), [])
+        emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+        self.assertEqual(self._search("оладьи"), ["Оладьи"])
+        Recipe.objects.filter(name="Оладьи").update(name="Сырники")
+        self.assertEqual(self._search("сырники"), ["Сырники"])
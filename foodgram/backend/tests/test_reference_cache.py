@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Tag
+
+
+class ReferenceCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.create(name="Завтрак", slug="breakfast")
+        Ingredient.objects.create(name="соль", measurement_unit="г")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_repeat_fetch_is_served_from_cache(self):
+        first = self.client.get("/api/tags/")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()[0]["slug"], "breakfast")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/tags/")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get("/api/ingredients/")["ETag"]
+        resp = self.client.get("/api/ingredients/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b"")
+        self.assertEqual(resp["ETag"], etag)
+
+    def test_write_invalidates_cached_response(self):
+        etag = self.client.get("/api/tags/")["ETag"]
+        Tag.objects.create(name="Ужин", slug="dinner")
+        resp = self.client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(len(resp.json()), 2)
+
+    def test_load_tags_invalidates_cached_response(self):
+        self.client.get("/api/tags/")
+        call_command("load_tags", stdout=StringIO())
+        self.assertEqual(len(self.client.get("/api/tags/").json()), 3)
@@ -0,0 +1,270 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingCart,
+    ShoppingListItem,
+)
+from users.models import Subscription, User
+
+
+class RelationEndpointsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Reader",
+            last_name="Reader",
+        )
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author,
+            name="Суп",
+            image="recipes/images/test.png",
+            text="Текст",
+            cooking_time=10,
+        )
+        IngredientAmount.objects.create(
+            recipe=cls.recipe,
+            ingredient=Ingredient.objects.create(
+                name="соль", measurement_unit="г"
+            ),
+            amount=5,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_favorite_is_inserted_once(self):
+        url = f"/api/recipes/{self.recipe.pk}/favorite/"
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.post(url)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["name"], "Суп")
+        inserts = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("INSERT")
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn("ON CONFLICT DO NOTHING", inserts[0])
+        favorite = Favorite.objects.get(user=self.user, recipe=self.recipe)
+        self.assertIsNotNone(favorite.created)
+
+        resp = self.client.post(url)
+        self.assertEqual(resp.status_code, 400)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 0)
+
+    def test_cart_insert_updates_shopping_list(self):
+        url = f"/api/recipes/{self.recipe.pk}/shopping_cart/"
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(
+            ShoppingCart.objects.filter(user=self.user).count(), 1
+        )
+        self.assertEqual(
+            ShoppingListItem.objects.get(user=self.user).amount, 5
+        )
+
+    def test_unknown_recipe(self):
+        for action in ("favorite", "shopping_cart"):
+            url = f"/api/recipes/999999/{action}/"
+            self.assertEqual(self.client.post(url).status_code, 404)
+            self.assertEqual(self.client.delete(url).status_code, 404)
+
+    def test_subscribe_is_inserted_once(self):
+        url = f"/api/users/{self.author.pk}/subscribe/"
+        resp = self.client.post(url)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["recipes_count"], 1)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(
+            Subscription.objects.filter(user=self.user).count(), 1
+        )
+        self.assertEqual(
+            self.client.post(
+                f"/api/users/{self.user.pk}/subscribe/"
+            ).status_code,
+            400,
+        )
+        self.assertEqual(
+            self.client.post("/api/users/999999/subscribe/").status_code, 404
+        )
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+
+    def test_batch_favorites(self):
+        other = Recipe.objects.create(
+            author=self.author,
+            name="Каша",
+            image="recipes/images/test.png",
+            text="Текст",
+            cooking_time=10,
+        )
+        Favorite.objects.create(user=self.user, recipe=other)
+        resp = self.client.post(
+            "/api/recipes/favorite/batch/",
+            {"add": [self.recipe.pk, other.pk, 999999, self.recipe.pk]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.data["add"],
+            [
+                {"id": self.recipe.pk, "status": "created"},
+                {"id": other.pk, "status": "exists"},
+                {"id": 999999, "status": "not_found"},
+            ],
+        )
+        resp = self.client.post(
+            "/api/recipes/favorite/batch/",
+            {"remove": [other.pk, self.recipe.pk, 999999]},
+            format="json",
+        )
+        self.assertEqual(
+            [item["status"] for item in resp.data["remove"]],
+            ["deleted", "deleted", "not_found"],
+        )
+        self.assertFalse(Favorite.objects.filter(user=self.user).exists())
+        other.refresh_from_db()
+        self.assertEqual(other.favorites_count, 0)
+
+    def test_batch_cart_runs_in_one_transaction(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.recipe)
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.post(
+                "/api/recipes/shopping_cart/batch/",
+                {"add": [], "remove": [self.recipe.pk]},
+                format="json",
+            )
+        self.assertEqual(
+            resp.data["remove"], [{"id": self.recipe.pk, "status": "deleted"}]
+        )
+        self.assertFalse(ShoppingListItem.objects.filter(user=self.user))
+        # Внутри TestCase atomic() открывает точку сохранения.
+        self.assertTrue(
+            any(
+                query["sql"].startswith("SAVEPOINT")
+                for query in context.captured_queries
+            )
+        )
+
+    def test_batch_validation(self):
+        url = "/api/recipes/shopping_cart/batch/"
+        self.assertEqual(
+            self.client.post(url, {}, format="json").status_code, 400
+        )
+        resp = self.client.post(
+            url,
+            {"add": [self.recipe.pk], "remove": [self.recipe.pk]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(
+            self.client.post(
+                url, {"add": list(range(1, 500))}, format="json"
+            ).status_code,
+            400,
+        )
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.client.post(url, {"add": [1]}, format="json").status_code,
+            401,
+        )
+
+    def _batch_queries(self, action, recipes):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.post(
+                f"/api/recipes/{action}/batch/",
+                {"add": [recipe.pk for recipe in recipes]},
+                format="json",
+            )
+        self.assertEqual(resp.status_code, 200)
+        with CaptureQueriesContext(connection) as remove_context:
+            resp = self.client.post(
+                f"/api/recipes/{action}/batch/",
+                {"remove": [recipe.pk for recipe in recipes]},
+                format="json",
+            )
+        self.assertEqual(resp.status_code, 200)
+        return len(context), len(remove_context)
+
+    def test_batch_queries_do_not_grow_with_size(self):
+        salt = Ingredient.objects.get(name="соль")
+        pepper = Ingredient.objects.create(name="перец", measurement_unit="г")
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                author=self.author,
+                name=f"Рецепт {number}",
+                image="recipes/images/test.png",
+                text="Текст",
+                cooking_time=10,
+            )
+            for number in range(50)
+        )
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(recipe=recipe, ingredient=ingredient, amount=2)
+            for recipe in recipes
+            for ingredient in (salt, pepper)
+        )
+        for action in ("favorite", "shopping_cart"):
+            with self.subTest(action=action):
+                self.assertEqual(
+                    self._batch_queries(action, recipes[:2]),
+                    self._batch_queries(action, recipes[2:]),
+                )
+        self.client.post(
+            "/api/recipes/favorite/batch/",
+            {"add": [recipe.pk for recipe in recipes]},
+            format="json",
+        )
+        self.client.post(
+            "/api/recipes/shopping_cart/batch/",
+            {"add": [recipe.pk for recipe in recipes[:10]]},
+            format="json",
+        )
+        self.assertEqual(
+            set(
+                Recipe.objects.filter(pk__in=[r.pk for r in recipes])
+                .values_list("favorites_count", flat=True)
+            ),
+            {1},
+        )
+        self.assertEqual(
+            dict(
+                ShoppingListItem.objects.filter(user=self.user).values_list(
+                    "ingredient__name", "amount"
+                )
+            ),
+            {"соль": 20, "перец": 20},
+        )
+        self.client.post(
+            "/api/recipes/shopping_cart/batch/",
+            {"remove": [recipe.pk for recipe in recipes[:4]]},
+            format="json",
+        )
+        self.assertEqual(
+            ShoppingListItem.objects.get(
+                user=self.user, ingredient=salt
+            ).amount,
+            12,
+        )
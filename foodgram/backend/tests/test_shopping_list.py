@@ -0,0 +1,210 @@
+import json
+import re
+import zlib
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag,
+)
+from users.models import User
+
+
+class ShoppingListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="cook@example.com",
+            username="cook",
+            first_name="Cook",
+            last_name="Cook",
+        )
+        cls.tag = Tag.objects.create(name="Обед", slug="lunch")
+        cls.salt = Ingredient.objects.create(name="соль", measurement_unit="г")
+        cls.flour = Ingredient.objects.create(
+            name="мука", measurement_unit="г"
+        )
+        cls.soup = cls._recipe("Суп", {cls.salt: 5, cls.flour: 100})
+        cls.bread = cls._recipe("Хлеб", {cls.salt: 10})
+
+    @classmethod
+    def _recipe(cls, name, amounts):
+        recipe = Recipe.objects.create(
+            author=cls.user,
+            name=name,
+            image="recipes/images/test.png",
+            text="Текст",
+            cooking_time=10,
+        )
+        recipe.tags.add(cls.tag)
+        for ingredient, amount in amounts.items():
+            IngredientAmount.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+        return recipe
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _totals(self):
+        return dict(
+            ShoppingListItem.objects.filter(user=self.user).values_list(
+                "ingredient__name", "amount"
+            )
+        )
+
+    def test_cart_changes_update_totals(self):
+        for recipe in (self.soup, self.bread):
+            resp = self.client.post(f"/api/recipes/{recipe.pk}/shopping_cart/")
+            self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self._totals(), {"соль": 15, "мука": 100})
+        self.client.delete(f"/api/recipes/{self.soup.pk}/shopping_cart/")
+        self.assertEqual(self._totals(), {"соль": 10})
+        self.bread.delete()
+        self.assertEqual(self._totals(), {})
+
+    def test_recipe_edit_updates_totals(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        ShoppingCart.objects.create(user=self.user, recipe=self.bread)
+        resp = self.client.patch(
+            f"/api/recipes/{self.soup.pk}/",
+            {
+                "tags": [self.tag.pk],
+                "ingredients": [{"id": self.flour.pk, "amount": 200}],
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._totals(), {"соль": 10, "мука": 200})
+
+    def _download(self, **params):
+        resp = self.client.get("/api/recipes/download_shopping_cart/", params)
+        self.assertEqual(resp.status_code, 200)
+        if resp.streaming:
+            return resp, b"".join(resp.streaming_content)
+        return resp, resp.content
+
+    def test_download_reads_materialized_totals(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        ShoppingCart.objects.create(user=self.user, recipe=self.bread)
+        with self.assertNumQueries(1):
+            resp, content = self._download()
+        self.assertTrue(resp.streaming)
+        self.assertEqual(
+            content.decode(),
+            "Список покупок:\nмука (г) - 100\nсоль (г) - 15\n",
+        )
+
+    def test_export_formats(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        resp, content = self._download(type="csv")
+        self.assertEqual(
+            content.decode("utf-8-sig").splitlines(),
+            ["name,measurement_unit,amount", "мука,г,100", "соль,г,5"],
+        )
+        resp, content = self._download(type="json")
+        self.assertEqual(
+            json.loads(content),
+            [
+                {"name": "мука", "measurement_unit": "г", "amount": 100},
+                {"name": "соль", "measurement_unit": "г", "amount": 5},
+            ],
+        )
+        resp, content = self._download(type="pdf")
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        self.assertTrue(content.startswith(b"%PDF"))
+        self.assertIn(
+            "shopping_list.pdf", resp["Content-Disposition"]
+        )
+        resp = self.client.get(
+            "/api/recipes/download_shopping_cart/", {"type": "docx"}
+        )
+        self.assertEqual(resp.status_code, 400)
+
+    def test_unchanged_cart_is_served_from_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        _, first = self._download(type="json")
+        with self.assertNumQueries(0):
+            resp, second = self._download(type="json")
+        self.assertFalse(resp.streaming)
+        self.assertEqual(second, first)
+        with self.captureOnCommitCallbacks(execute=True):
+            ShoppingCart.objects.create(user=self.user, recipe=self.bread)
+        _, third = self._download(type="json")
+        self.assertEqual(
+            {item["name"]: item["amount"] for item in json.loads(third)},
+            {"мука": 100, "соль": 15},
+        )
+
+    def test_ingredient_rename_invalidates_export(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        self._download(type="json")
+        self.salt.name = "соль морская"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.salt.save()
+        _, content = self._download(type="json")
+        self.assertIn(
+            "соль морская", [item["name"] for item in json.loads(content)]
+        )
+
+    def test_pdf_is_text_with_valid_xref(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        ShoppingListItem.objects.bulk_create(
+            ShoppingListItem(
+                user=self.user,
+                ingredient=Ingredient.objects.create(
+                    name=f"специя {number}", measurement_unit="г"
+                ),
+                amount=number,
+            )
+            for number in range(1, 100)
+        )
+        _, content = self._download(type="pdf")
+        self.assertEqual(content.count(b"/Type /Page "), 3)
+        start = int(re.search(rb"startxref\n(\d+)", content)[1])
+        offsets = re.findall(rb"(\d{10}) 00000 n ", content[start:])
+        for number, offset in enumerate(offsets, start=1):
+            self.assertTrue(
+                content[int(offset):].startswith(b"%d 0 obj" % number)
+            )
+        streams = b"".join(
+            zlib.decompress(stream)
+            for stream in re.findall(
+                rb"stream\n(.*?)\nendstream", content, re.S
+            )
+        )
+        # Карта ToUnicode делает кириллицу доступной для поиска: «с» U+0441.
+        self.assertIn(b"<0441>", streams)
+        self.assertIn(b"Tj T*", streams)
+
+    @override_settings(SHOPPING_LIST_PDF_FONT="missing-font.ttf")
+    def test_pdf_without_font_fails(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        with self.assertRaises(ImproperlyConfigured):
+            self.client.get(
+                "/api/recipes/download_shopping_cart/", {"type": "pdf"}
+            )
+
+    def test_rebuild_command(self):
+        ShoppingCart.objects.create(user=self.user, recipe=self.soup)
+        ShoppingListItem.objects.filter(ingredient=self.salt).update(amount=1)
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_shopping_lists", "--check", stdout=StringIO()
+            )
+        call_command("rebuild_shopping_lists", stdout=StringIO())
+        self.assertEqual(self._totals(), {"соль": 5, "мука": 100})
+        call_command("rebuild_shopping_lists", "--check", stdout=StringIO())
@@ -0,0 +1,82 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, IngredientAmount, Recipe, SimilarRecipe
+from users.models import User
+
+
+class SimilarRecipesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+        )
+        salt, flour, eggs, milk, kefir, beet = (
+            Ingredient.objects.create(name=name, measurement_unit="г")
+            for name in ("соль", "мука", "яйца", "молоко", "кефир", "свекла")
+        )
+        cls.pancakes = cls._recipe("Блины", (flour, eggs, milk, salt))
+        cls.fritters = cls._recipe("Оладьи", (flour, eggs, kefir, salt))
+        cls.omelette = cls._recipe("Омлет", (eggs, milk, salt))
+        cls.borscht = cls._recipe("Борщ", (beet, salt))
+
+    @classmethod
+    def _recipe(cls, name, ingredients):
+        recipe = Recipe.objects.create(
+            author=cls.author,
+            name=name,
+            image="recipes/images/test.png",
+            text="Текст",
+            cooking_time=10,
+        )
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        )
+        return recipe
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _similar(self, recipe):
+        resp = self.client.get(f"/api/recipes/{recipe.pk}/similar/")
+        self.assertEqual(resp.status_code, 200)
+        return [item["name"] for item in resp.data]
+
+    def test_neighbours_ranked_by_shared_rare_ingredients(self):
+        call_command("refresh_similar_recipes", stdout=StringIO())
+        # Соль есть во всех рецептах и на сходство не влияет.
+        self.assertEqual(self._similar(self.pancakes), ["Омлет", "Оладьи"])
+        self.assertEqual(self._similar(self.borscht), [])
+        scores = SimilarRecipe.objects.filter(
+            recipe=self.pancakes
+        ).values_list("score", flat=True)
+        self.assertTrue(all(0 < score <= 1 for score in scores))
+
+    def test_serving_is_a_single_query(self):
+        call_command("refresh_similar_recipes", stdout=StringIO())
+        with self.assertNumQueries(1):
+            resp = self.client.get(f"/api/recipes/{self.omelette.pk}/similar/")
+        self.assertEqual(resp.data[0]["name"], "Блины")
+        self.assertIn("score", resp.data[0])
+
+    def test_top_k_and_refresh_replaces_rows(self):
+        call_command(
+            "refresh_similar_recipes", "--top-k", "1", stdout=StringIO()
+        )
+        self.assertEqual(self._similar(self.pancakes), ["Омлет"])
+        self.fritters.delete()
+        call_command("refresh_similar_recipes", stdout=StringIO())
+        self.assertEqual(
+            SimilarRecipe.objects.filter(recipe=self.pancakes).count(), 1
+        )
+
+    def test_unknown_recipe(self):
+        resp = self.client.get("/api/recipes/999999/similar/")
+        self.assertEqual(resp.status_code, 404)
@@ -0,0 +1,86 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from users.models import Subscription, User
+
+
+def create_user(number):
+    return User.objects.create_user(
+        email=f"user{number}@example.com",
+        username=f"user{number}",
+        first_name="User",
+        last_name=str(number),
+    )
+
+
+class UserListQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(0)
+        cls.authors = [create_user(number) for number in range(1, 9)]
+        for author in cls.authors[::2]:
+            Subscription.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _list_queries(self, limit):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get("/api/users/", {"limit": limit})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["results"]), limit)
+        return resp, context.captured_queries
+
+    def test_is_subscribed(self):
+        resp, _ = self._list_queries(9)
+        subscribed = {author.pk for author in self.authors[::2]}
+        for item in resp.data["results"]:
+            self.assertEqual(item["is_subscribed"], item["id"] in subscribed)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        _, small = self._list_queries(2)
+        _, large = self._list_queries(9)
+        self.assertEqual(len(small), len(large))
+
+
+class SubscriptionsQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(0)
+        cls.authors = [create_user(number) for number in range(1, 6)]
+        for index, author in enumerate(cls.authors):
+            Subscription.objects.create(user=cls.user, author=author)
+            for number in range(index + 1):
+                Recipe.objects.create(
+                    author=author,
+                    name=f"Рецепт {number}",
+                    image="recipes/images/test.png",
+                    text="Текст",
+                    cooking_time=10,
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _subscriptions(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get("/api/users/subscriptions/", params)
+        self.assertEqual(resp.status_code, 200)
+        return resp, context.captured_queries
+
+    def test_recipes_limit_and_count(self):
+        resp, _ = self._subscriptions(recipes_limit=2)
+        for index, item in enumerate(resp.data["results"]):
+            self.assertEqual(item["recipes_count"], index + 1)
+            self.assertEqual(len(item["recipes"]), min(index + 1, 2))
+            self.assertTrue(item["is_subscribed"])
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        _, small = self._subscriptions(limit=1, recipes_limit=2)
+        _, large = self._subscriptions(limit=5, recipes_limit=2)
+        self.assertEqual(len(small), len(large))
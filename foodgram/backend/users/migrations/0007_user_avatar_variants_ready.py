@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_variants_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Варианты аватара готовы'),
+        ),
+    ]
@@ -22,6 +22,16 @@ class User(AbstractUser):
             ])
         ],
     )
+    avatar_variants_ready = models.BooleanField(
+        "Варианты аватара готовы",
+        default=False,
+        editable=False,
+    )
+    recipes_count = models.PositiveIntegerField(
+        "Рецептов",
+        default=0,
+        editable=False,
+    )
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
 
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from recipes.image_variants import schedule_variants
+from recipes.media_files import file_replaced, remember_loaded_file
+from .models import User
+
+
+def _avatar_changed(update_fields):
+    return not update_fields or "avatar" in update_fields
+
+
+@receiver(post_save, sender=User)
+def generate_avatar_variants(instance, created, update_fields, **kwargs):
+    if not _avatar_changed(update_fields):
+        return
+    if created or file_replaced(instance, "avatar"):
+        schedule_variants(instance, "avatar")
+
+
+@receiver(post_init, sender=User)
+def remember_avatar(instance, **kwargs):
+    remember_loaded_file(instance, "avatar")